@@ -1,7 +1,9 @@
+from functools import wraps
 from django.http import HttpRequest
 from django.shortcuts import redirect
 
 def redirect_authenticated_user(view_func):
+    @wraps(view_func)
     def wrapper_func(request: HttpRequest, *args, **kwargs):
         if request.user.is_authenticated:
             return redirect('home')
@@ -1,5 +1,6 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from .manager import CustomUserManager
 from common.models import BaseModel
@@ -8,6 +9,34 @@ import uuid
 class TokenType(models.TextChoices):
     PASSWORD_RESET = ("PASSWORD_RESET", )
 
+class ExpiringQuerySet(models.QuerySet):
+    '''Rows that stop being usable a fixed lifetime after created_at'''
+    lifetime = timedelta(minutes=20)
+
+    def expiry_cutoff(self) -> datetime:
+        return timezone.now() - self.lifetime
+
+    def valid(self):
+        return self.filter(created_at__gte=self.expiry_cutoff())
+
+    def expired(self):
+        return self.filter(created_at__lt=self.expiry_cutoff())
+
+    def purge_expired(self, batch_size: int = 1000) -> int:
+        """
+        Delete expired rows batch_size at a time, so each DELETE holds its locks only briefly.
+        Returns the number of rows deleted.
+        """
+        cutoff = self.expiry_cutoff()
+        deleted = 0
+        while True:
+            batch = list(self.filter(created_at__lt=cutoff).order_by('created_at').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            count, _ = self.model._base_manager.filter(pk__in=batch).delete()
+            deleted += count
+
+
 class User(BaseModel, AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=255)
@@ -23,16 +52,16 @@ class PendingUser(BaseModel):
     password = models.CharField(max_length=255)
     verification_code = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ExpiringQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='pendinguser_created_at_idx'),
+        ]
     
     def is_valid(self) -> bool:
-        lifetime_in_seconds = 20 * 60
-        now = datetime.now(timezone.utc)
-        
-        timediff = now - self.created_at
-        timediff = timediff.total_seconds()
-        if timediff > lifetime_in_seconds:
-            return False
-        return True
+        return self.created_at >= timezone.now() - ExpiringQuerySet.lifetime
     
 class Token(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -41,18 +70,19 @@ class Token(models.Model):
     token_type = models.CharField(max_length=100, choices = TokenType.choices)
     created_at = models.DateTimeField(auto_now_add=True)
     
+
+    objects = ExpiringQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='token_created_at_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user} {self.token}"
     
     def is_valid(self) -> bool:
-        lifetime_in_seconds = 20 * 60 
-        now = datetime.now(timezone.utc)
-        
-        timediff = now - self.created_at
-        timediff = timediff.total_seconds()
-        if timediff > lifetime_in_seconds:
-            return False
-        return True
+        return self.created_at >= timezone.now() - ExpiringQuerySet.lifetime
     
     def reset_user_password(self, raw_password: str):
         self.user: User
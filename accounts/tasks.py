@@ -0,0 +1,18 @@
+import logging
+from celery import shared_task
+from .models import PendingUser, Token
+
+PURGE_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def purge_expired_rows(batch_size: int = PURGE_BATCH_SIZE) -> dict:
+    '''Delete expired verification codes and password reset tokens, run periodically by celery beat'''
+    deleted = {
+        'pending_users': PendingUser.objects.purge_expired(batch_size),
+        'tokens': Token.objects.purge_expired(batch_size),
+    }
+    logger.info('Purged %(pending_users)d expired pending users and %(tokens)d expired tokens', deleted)
+    return deleted
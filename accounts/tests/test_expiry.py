@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from accounts.models import PendingUser, Token, TokenType
+from accounts.tasks import purge_expired_rows
+from common.query_plans import assert_uses_indexes
+
+pytestmark = pytest.mark.django_db
+
+
+def make_pending_users(count: int, age: timedelta) -> None:
+    users = PendingUser.objects.bulk_create(
+        PendingUser(email=f"pending{age.seconds}-{i}@gmail.com", password="x", verification_code="1234")
+        for i in range(count)
+    )
+    PendingUser.objects.filter(pk__in=[user.pk for user in users]).update(created_at=timezone.now() - age)
+
+
+def test_valid_filters_expiry_in_sql():
+    make_pending_users(2, timedelta(minutes=5))
+    make_pending_users(3, timedelta(minutes=30))
+
+    assert PendingUser.objects.valid().count() == 2
+    assert PendingUser.objects.expired().count() == 3
+    assert all(user.is_valid() for user in PendingUser.objects.valid())
+    assert not any(user.is_valid() for user in PendingUser.objects.expired())
+
+
+def test_purge_expired_deletes_in_batches(django_assert_num_queries):
+    make_pending_users(2, timedelta(minutes=5))
+    make_pending_users(5, timedelta(minutes=30))
+
+    # three full or partial batches of (select ids, delete) and a final empty select
+    with django_assert_num_queries(7):
+        assert PendingUser.objects.purge_expired(batch_size=2) == 5
+
+    assert PendingUser.objects.count() == 2
+
+
+def test_purge_expired_rows_task(user_instance):
+    make_pending_users(3, timedelta(hours=2))
+    make_pending_users(1, timedelta(minutes=1))
+    Token.objects.create(user=user_instance, token="old", token_type=TokenType.PASSWORD_RESET)
+    Token.objects.update(created_at=timezone.now() - timedelta(days=1))
+    Token.objects.create(user=user_instance, token="new", token_type=TokenType.PASSWORD_RESET)
+
+    assert purge_expired_rows() == {"pending_users": 3, "tokens": 1}
+    assert list(Token.objects.values_list("token", flat=True)) == ["new"]
+
+
+def test_expiry_lookups_use_the_created_at_index():
+    assert_uses_indexes(PendingUser.objects.expired().order_by("created_at").values_list("pk", flat=True)[:1000])
+    assert_uses_indexes(Token.objects.expired())
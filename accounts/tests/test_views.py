@@ -193,4 +193,27 @@ def test_set_new_password_using_invalid_reset_token(client: Client, user_instanc
     messages = list(get_messages(response.wsgi_request))
     assert len(messages) == 1
     assert messages[0].level_tag == 'error'
-    assert "Invalid link" in messages[0].message
\ No newline at end of file
+    assert "Invalid link" in messages[0].message
+
+def test_login_is_rate_limited_per_email_before_authenticating(client: Client, user_instance, django_assert_num_queries):
+    url = reverse('login')
+    request_data = {'email': user_instance.email, 'password': 'wrongpassword'}
+    for _ in range(5):
+        client.post(url, request_data)
+
+    with django_assert_num_queries(0):
+        response = client.post(url, request_data)
+    assert response.status_code == 429
+
+
+def test_resend_verification_cooldown(client: Client, monkeypatch):
+    monkeypatch.setattr('accounts.views.send_email.delay', lambda *args, **kwargs: None)
+    PendingUser.objects.create(email='abc@gmail.com', verification_code='8888', password='randompass')
+    url = reverse('resend_verification')
+
+    client.post(url, {'email': 'abc@gmail.com'})
+    response = client.post(url, {'email': 'abc@gmail.com'})
+
+    assert response.status_code == 429
+    messages = list(get_messages(response.wsgi_request))
+    assert 'only every 5 minutes' in str(messages[-1])
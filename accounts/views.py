@@ -4,16 +4,25 @@ from .models import User, PendingUser, Token, TokenType
 from django.contrib.auth.hashers import make_password
 from django.contrib import messages, auth
 from django.utils.crypto import get_random_string
-from datetime import datetime, timedelta
+from datetime import datetime
 from django.utils import timezone
 from common.tasks import send_email
 from django.contrib.auth import get_user_model
 from .decorators import redirect_authenticated_user
+from common.ratelimit import rate_limit
+
+
+def resend_cooldown(request: HttpRequest, retry_after: float):
+    email = request.POST.get("email", "").strip().lower()
+    messages.error(request, "You can request a new code only every 5 minutes.")
+    return render(request, "verify_account.html", {"email": email}, status=429)
 
 
 def home(request: HttpRequest):
     return render(request, 'home.html')
 
+@rate_limit('10/m', key='ip')
+@rate_limit('5/m', key='post:email')
 @redirect_authenticated_user
 def login(request: HttpRequest):
     if request.method == 'POST':
@@ -36,6 +45,8 @@ def logout(request: HttpRequest):
     messages.success(request, 'Logout successful')
     return redirect('home')
 
+@rate_limit('5/m', key='ip')
+@rate_limit('3/10m', key='post:email')
 @redirect_authenticated_user
 def register(request):
     if request.method == "POST":
@@ -89,13 +100,9 @@ def verify_account(request):
             messages.error(request, "Please enter the verification code.")
             return render(request, 'verify_account.html', {'email': email})
 
-        pending_user = PendingUser.objects.filter(email=email, verification_code=code).first()
+        pending_user = PendingUser.objects.valid().filter(email=email, verification_code=code).first()
 
-        if pending_user.verification_code == code:
-            if not pending_user.is_valid():
-                messages.error(request, "Verification code expired. Please resend a new code.")
-                return render(request, "verify_account.html", {"email": email})
-            
+        if pending_user:
             user = User(email=pending_user.email)
             user.password = pending_user.password 
             user.save()
@@ -106,12 +113,14 @@ def verify_account(request):
             messages.success(request, "Account verified!")
             return redirect('home')
         else:
-            messages.error(request, "Invalid verification code.")
+            messages.error(request, "Invalid or expired verification code.")
             return render(request, 'verify_account.html', {'email': email}, status=400)
 
     email = request.GET.get('email', '')
     return render(request, 'verify_account.html', {'email': email})
 
+@rate_limit('5/m', key='ip')
+@rate_limit('1/5m', key='post:email', limited_response=resend_cooldown)
 def resend_verification(request):
     if request.method == "POST":
         email = request.POST.get("email", "").strip().lower()
@@ -122,17 +131,10 @@ def resend_verification(request):
 
         pending_user = PendingUser.objects.filter(email=email).first()
         if pending_user:
-            now = timezone.now()
-            cooldown = timedelta(minutes=5)  
-
-            if now - pending_user.created_at < cooldown:
-                messages.error(request, "You can request a new code only every 5 minutes.")
-                return render(request, "verify_account.html", {"email": email})
-
             verification_code = get_random_string(length=6)
             pending_user.verification_code = verification_code
-            pending_user.created_at = now
-            pending_user.save()
+            pending_user.created_at = timezone.now()
+            pending_user.save(update_fields=['verification_code', 'created_at'])
 
             send_email.delay(
                 'Verify your account',
@@ -147,6 +149,8 @@ def resend_verification(request):
         
         return render(request, "verify_account.html", {"email": email})
     
+@rate_limit('5/m', key='ip')
+@rate_limit('3/10m', key='post:email')
 def send_password_reset_link(request: HttpRequest):
     if request.method == 'POST':
         email:str = request.POST.get('email', '')
@@ -186,13 +190,13 @@ def verify_password_reset_link(request: HttpRequest):
     email = request.GET.get('email')
     reset_token = request.GET.get('token')
     
-    token = Token.objects.filter(
+    token = Token.objects.valid().filter(
         user__email=email,
         token=reset_token,
         token_type=TokenType.PASSWORD_RESET,
     ).first()
     
-    if not token or not token.is_valid():
+    if not token:
         messages.error(request, 'Invalid link')
         return redirect('forgot_password')
     
@@ -215,13 +219,13 @@ def set_new_password(request: HttpRequest):
                           context={'email': email, 'token': reset_token}
                           )
             
-        token: Token = Token.objects.filter(
+        token: Token = Token.objects.valid().filter(
             user__email=email,
             token=reset_token,
             token_type=TokenType.PASSWORD_RESET,
         ).first()
         
-        if not token or not token.is_valid():
+        if not token:
             messages.error(request, 'Invalid link')
             return redirect('forgot_password')
         
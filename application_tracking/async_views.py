@@ -0,0 +1,101 @@
+"""
+Async implementations of the read-heavy views, routed instead of the ones in views.py
+when settings.ASYNC_VIEWS is on. Database reads go through the async ORM; templates
+are still rendered in a worker thread because the context processors touch the session.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import HttpRequest, JsonResponse
+from django.shortcuts import aget_object_or_404, render
+from accounts.models import User
+from .autocomplete import cached_autocomplete, fold_term, get_autocomplete
+from .cache import cache_anonymous_listing
+from .facets import acached_facet_counts, facet_groups, filter_query, parse_facets
+from .feeds import afeed_adverts
+from .forms import JobApplicationForm
+from .models import JobAdvert, JobApplication
+from .pagination import CursorPaginator, aget_page
+from .views import SIMILAR_ADVERTS_SHOWN, autocomplete_query, search_scope
+
+arender = sync_to_async(render)
+
+
+async def apaginate_adverts(request: HttpRequest, adverts, per_page: int = 10, keyset: bool = True):
+    if keyset and 'cursor' in request.GET:
+        return await CursorPaginator(adverts, per_page).aget_page(request.GET.get('cursor'))
+    return await aget_page(Paginator(adverts, per_page), request.GET.get('page'))
+
+@cache_anonymous_listing
+async def list_adverts(request: HttpRequest):
+    active_jobs = JobAdvert.objects.active()
+    selected = parse_facets(request.GET)
+    facet_counts = await acached_facet_counts(active_jobs, 'home', selected)
+    paginated_adverts = await apaginate_adverts(request, active_jobs.filter_facets(selected).prefetch_skills())
+    user = await request.auser()
+    
+    context = {
+        'job_adverts': paginated_adverts,
+        'facets': facet_groups(facet_counts, selected),
+        'filter_query': filter_query(request.GET),
+        'keyset_pages': True,
+        'feed_adverts': await afeed_adverts(user.email) if user.is_authenticated else [],
+    }
+    
+    return await arender(request, 'home.html', context)
+
+async def get_advert(request: HttpRequest, advert_id):
+    form = JobApplicationForm()
+    job_advert = await aget_object_or_404(JobAdvert.objects.prefetch_skills(), id=advert_id)
+    similar_adverts = JobAdvert.objects.active().similar_to(job_advert)[:SIMILAR_ADVERTS_SHOWN]
+    context = {
+        'job_advert': job_advert,
+        'application_form': form,
+        'similar_adverts': [advert async for advert in similar_adverts],
+    }
+    return await arender(request, 'advert.html', context)
+
+@login_required
+async def my_applications(request: HttpRequest):
+    user: User = await request.auser()
+    
+    applications = JobApplication.objects.filter(email = user.email).with_advert_totals()
+    paginated_applications = await aget_page(Paginator(applications, 10), request.GET.get('page'))
+    
+    context = {
+        'my_applications': paginated_applications,
+    }
+    
+    return await arender(request, 'my_applications.html', context)
+
+@cache_anonymous_listing
+async def search(request: HttpRequest):
+    keyword = request.GET.get('keyword')
+    location = request.GET.get('location')
+    skills = request.GET.getlist('skill')
+    result = JobAdvert.objects.search(keyword, location, skills)
+    selected = parse_facets(request.GET)
+    facet_counts = await acached_facet_counts(result, search_scope(keyword, location, skills), selected)
+    keyset = not keyword
+    paginated_adverts = await apaginate_adverts(
+        request, result.filter_facets(selected).prefetch_skills(), keyset=keyset
+    )
+    
+    context = {
+        'job_adverts': paginated_adverts,
+        'facets': facet_groups(facet_counts, selected),
+        'filter_query': filter_query(request.GET),
+        'keyset_pages': keyset,
+        'skills': skills,
+    }
+    
+    return await arender(request, 'home.html', context)
+
+
+async def autocomplete(request: HttpRequest):
+    prefix, kinds = autocomplete_query(request.GET)
+    if not fold_term(prefix):
+        return JsonResponse({'suggestions': []})
+    # only the periodic check for other processes' writes, and the first build, leave the event loop
+    index = cached_autocomplete() or await sync_to_async(get_autocomplete)()
+    return JsonResponse({'suggestions': index.suggest(prefix, kinds)})
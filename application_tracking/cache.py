@@ -0,0 +1,86 @@
+import hashlib
+from datetime import datetime, time, timedelta
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+LISTING_VERSION_KEY = 'adverts:listing:version'
+
+
+def listing_version() -> int:
+    return cache.get_or_set(LISTING_VERSION_KEY, 1, timeout=None)
+
+
+async def alisting_version() -> int:
+    return await cache.aget_or_set(LISTING_VERSION_KEY, 1, timeout=None)
+
+
+def bump_listing_version() -> None:
+    '''Invalidate every cached listing and search page at once by moving to a new key namespace'''
+    try:
+        cache.incr(LISTING_VERSION_KEY)
+    except ValueError:
+        cache.set(LISTING_VERSION_KEY, 2, timeout=None)
+
+
+def seconds_until_midnight() -> int:
+    '''Adverts drop out of JobAdvertQuerySet.active() when the date changes'''
+    now = timezone.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def listing_cache_key(request: HttpRequest, version: int) -> str:
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'adverts:listing:{version}:{timezone.now().date().isoformat()}:{path}'
+
+
+def cache_timeout() -> int:
+    return min(settings.LISTING_CACHE_TIMEOUT, seconds_until_midnight())
+
+
+def cache_anonymous_listing(view_func):
+    """
+    Serve rendered listing pages to anonymous visitors from the cache.
+    Pages are keyed on the listing version, which signals bump on every advert write,
+    and on today's date, so adverts whose deadline has passed disappear at midnight.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper_func(request: HttpRequest, *args, **kwargs):
+            user = await request.auser()
+            if request.method != 'GET' or user.is_authenticated or await sync_to_async(len)(get_messages(request)):
+                return await view_func(request, *args, **kwargs)
+
+            key = listing_cache_key(request, await alisting_version())
+            cached = await cache.aget(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                await cache.aset(key, (response.content, response['Content-Type']), cache_timeout())
+            return response
+        return async_wrapper_func
+
+    @wraps(view_func)
+    def wrapper_func(request: HttpRequest, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated or len(get_messages(request)):
+            return view_func(request, *args, **kwargs)
+
+        key = listing_cache_key(request, listing_version())
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.content, response['Content-Type']), cache_timeout())
+        return response
+    return wrapper_func
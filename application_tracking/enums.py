@@ -26,6 +26,20 @@ LocationType = [
 
 class ApplicationStatus(models.TextChoices):
     APPLIED = ('APPLIED', 'APPLIED')
-    INTERVIEWE = ('INTERVIEWE', 'INTERVIEWE')
+    INTERVIEW = ('INTERVIEW', 'INTERVIEW')
     REJECTED = ('REJECTED', 'REJECTED')
-    HIRED = ('HIRED', 'HIRED')
\ No newline at end of file
+    HIRED = ('HIRED', 'HIRED')
+
+class SalaryBand(models.TextChoices):
+    UNDER_50K = ('under-50k', 'Under 50,000')
+    FROM_50K = ('50k-100k', '50,000 - 100,000')
+    FROM_100K = ('100k-200k', '100,000 - 200,000')
+    OVER_200K = ('200k-plus', '200,000+')
+
+# band -> [low, high) salary range, None for no upper bound
+SALARY_BAND_RANGES = {
+    SalaryBand.UNDER_50K: (0, 50_000),
+    SalaryBand.FROM_50K: (50_000, 100_000),
+    SalaryBand.FROM_100K: (100_000, 200_000),
+    SalaryBand.OVER_200K: (200_000, None),
+}
@@ -0,0 +1,117 @@
+"""
+Facet filters for the advert listing and search pages. Counts for every facet come from one
+GROUP BY over all facet columns, folded in Python so each facet's counts ignore its own selection
+(picking "Remote" still shows how many "Hybrid" jobs there are) while honouring the others.
+"""
+import hashlib
+from collections import defaultdict
+from django.core.cache import cache
+from django.db.models import Case, CharField, Q, Value, When
+from django.http import QueryDict
+from .cache import alisting_version, cache_timeout, listing_version
+from .enums import EmploymentType, ExperienceLevel, LocationType, SalaryBand, SALARY_BAND_RANGES
+
+SALARY_BAND = 'salary_band'
+
+# query parameter -> (label, choices)
+FACETS = {
+    'employment_type': ('Employment type', EmploymentType),
+    'experience_level': ('Experience level', ExperienceLevel),
+    'job_type': ('Job type', LocationType),
+    SALARY_BAND: ('Salary', SalaryBand.choices),
+}
+
+
+def parse_facets(params: QueryDict) -> dict[str, list[str]]:
+    '''Selected facet values from the query string, unknown values dropped'''
+    selected = {}
+    for name, (_, choices) in FACETS.items():
+        valid = {value for value, _ in choices}
+        values = sorted({value for value in params.getlist(name) if value in valid})
+        if values:
+            selected[name] = values
+    return selected
+
+
+def salary_band_case() -> Case:
+    return Case(
+        *(
+            When(Q(salary__gte=low) & (Q(salary__lt=high) if high is not None else Q()), then=Value(band))
+            for band, (low, high) in SALARY_BAND_RANGES.items()
+        ),
+        default=Value(''),
+        output_field=CharField(),
+    )
+
+
+def salary_band_filter(bands: list[str]) -> Q:
+    query = Q()
+    for band in bands:
+        low, high = SALARY_BAND_RANGES[band]
+        query |= Q(salary__gte=low) & (Q(salary__lt=high) if high is not None else Q())
+    return query
+
+
+def fold_counts(rows, selected: dict[str, list[str]]) -> dict[str, dict[str, int]]:
+    '''Turn (facet values..., count) rows of the grouped query into per-facet value counts'''
+    counts = {name: defaultdict(int) for name in FACETS}
+    for row in rows:
+        for name in FACETS:
+            if all(row[other] in values for other, values in selected.items() if other != name):
+                counts[name][row[name]] += row['count']
+    return {name: dict(values) for name, values in counts.items()}
+
+
+def facet_cache_key(scope: str, selected: dict[str, list[str]], version: int) -> str:
+    digest = hashlib.md5(repr((scope, sorted(selected.items()))).encode()).hexdigest()
+    return f'adverts:facets:{version}:{digest}'
+
+
+def cached_facet_counts(queryset, scope: str, selected: dict[str, list[str]]) -> dict[str, dict[str, int]]:
+    """
+    Facet counts for queryset, cached under scope (the page and its keyword and location)
+    until the next advert write or midnight, like the cached listing pages.
+    """
+    key = facet_cache_key(scope, selected, listing_version())
+    counts = cache.get(key)
+    if counts is None:
+        counts = queryset.facet_counts(selected)
+        cache.set(key, counts, cache_timeout())
+    return counts
+
+
+async def acached_facet_counts(queryset, scope: str, selected: dict[str, list[str]]) -> dict[str, dict[str, int]]:
+    key = facet_cache_key(scope, selected, await alisting_version())
+    counts = await cache.aget(key)
+    if counts is None:
+        counts = await queryset.afacet_counts(selected)
+        await cache.aset(key, counts, cache_timeout())
+    return counts
+
+
+def facet_groups(counts: dict[str, dict[str, int]], selected: dict[str, list[str]]) -> list[dict]:
+    '''Template-ready facets: every choice with its count and whether it is ticked'''
+    return [
+        {
+            'name': name,
+            'label': label,
+            'options': [
+                {
+                    'value': value,
+                    'label': option_label,
+                    'count': counts.get(name, {}).get(value, 0),
+                    'selected': value in selected.get(name, []),
+                }
+                for value, option_label in choices
+            ],
+        }
+        for name, (label, choices) in FACETS.items()
+    ]
+
+
+def filter_query(params: QueryDict) -> str:
+    '''The query string without its page or cursor, for building pagination links'''
+    params = params.copy()
+    for key in ('page', 'cursor'):
+        params.pop(key, None)
+    return params.urlencode()
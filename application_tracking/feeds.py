@@ -0,0 +1,84 @@
+"""
+Personalised "recommended for you" feeds. A user's profile is the sum of the TF-IDF vectors of
+the adverts they recently applied to, so an advert's score against it is the sum of its cosine
+similarities with those adverts, which SimilarAdvert already holds for each advert's nearest
+neighbours. Feeds are built by celery and read from the cache; requests never score adverts.
+"""
+import hashlib
+import heapq
+from collections import defaultdict
+from operator import itemgetter
+from django.core.cache import cache
+from .models import JobAdvert, JobApplication, SimilarAdvert
+
+FEED_SIZE = 8
+# the most recent applications making up the profile, each weighing RECENCY_DECAY times the next newer one
+FEED_HISTORY = 20
+RECENCY_DECAY = 0.9
+# outlives the nightly rebuild, so feeds only go missing for users who never applied
+FEED_TIMEOUT = 2 * 24 * 60 * 60
+
+
+def feed_cache_key(email: str) -> str:
+    return f'feeds:{hashlib.md5(email.lower().encode()).hexdigest()}'
+
+
+def build_feeds(emails: list[str]) -> dict[str, list]:
+    '''Recommended advert ids for each email, best first, in two queries however many emails'''
+    applied, history = defaultdict(set), defaultdict(list)
+    applications = (
+        JobApplication.objects.filter(email__in=emails)
+        .order_by('email', '-created_at')
+        .values_list('email', 'job_advert_id')
+    )
+    for email, advert_id in applications:
+        applied[email].add(advert_id)
+        if len(history[email]) < FEED_HISTORY:
+            history[email].append(advert_id)
+
+    neighbours = defaultdict(list)
+    rows = SimilarAdvert.objects.filter(
+        advert__in={advert_id for adverts in history.values() for advert_id in adverts},
+        neighbour__in=JobAdvert.objects.active(),
+    ).values_list('advert_id', 'neighbour_id', 'score')
+    for advert_id, neighbour_id, score in rows:
+        neighbours[advert_id].append((neighbour_id, score))
+
+    feeds = {}
+    for email in emails:
+        scores = defaultdict(float)
+        for age, advert_id in enumerate(history[email]):
+            weight = RECENCY_DECAY ** age
+            for neighbour_id, score in neighbours[advert_id]:
+                if neighbour_id not in applied[email]:
+                    scores[neighbour_id] += weight * score
+        feeds[email] = [advert_id for advert_id, _ in heapq.nlargest(FEED_SIZE, scores.items(), key=itemgetter(1))]
+    return feeds
+
+
+def store_feeds(emails: list[str]) -> dict[str, list]:
+    feeds = build_feeds(emails)
+    cache.set_many({feed_cache_key(email): feed for email, feed in feeds.items()}, FEED_TIMEOUT)
+    return feeds
+
+
+def order_feed(feed: list, adverts) -> list[JobAdvert]:
+    '''Adverts of the feed still active, in feed order'''
+    found = {advert.pk: advert for advert in adverts}
+    return [found[advert_id] for advert_id in feed if advert_id in found]
+
+
+def feed_adverts(email: str) -> list[JobAdvert]:
+    '''The cached feed of email, empty until celery has built it'''
+    feed = cache.get(feed_cache_key(email))
+    if not feed:
+        return []
+    return order_feed(feed, JobAdvert.objects.active().filter(pk__in=feed).prefetch_skills())
+
+
+async def afeed_adverts(email: str) -> list[JobAdvert]:
+    feed = await cache.aget(feed_cache_key(email))
+    if not feed:
+        return []
+    adverts = JobAdvert.objects.active().filter(pk__in=feed).prefetch_skills()
+    return order_feed(feed, [advert async for advert in adverts])
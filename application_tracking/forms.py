@@ -62,6 +62,7 @@ class JobApplicationForm(ModelForm):
             'name',
             'email',
             'portfolio_url',
+            'skills',
             'cv',
         ]
         
@@ -69,5 +70,6 @@ class JobApplicationForm(ModelForm):
             'name': forms.TextInput(attrs={'placeholder': 'Name', 'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent transition-all duration-200'}),
             'email': forms.EmailInput(attrs={'placeholder': 'Email', 'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent transition-all duration-200'}),
             'portfolio_url': forms.URLInput(attrs={'placeholder': 'Portfolio Link', 'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent transition-all duration-200'}),
+            'skills': forms.TextInput(attrs={'placeholder': 'e.g., Python, SQL, Figma', 'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent transition-all duration-200'}),
             'cv': forms.FileInput(attrs={'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent transition-all duration-200 bg-white', 'accept': '.pdf,.doc,.docx', 'placeholder': 'Upload CV'}),
         }
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import importlib
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+from accounts.models import User
+from application_tracking.models import JobAdvert, JobApplication
+from application_tracking.search import get_search_backend
+
+import application_tracking.urls
+import job_portal.urls
+
+
+def reload_urlconf():
+    importlib.reload(application_tracking.urls)
+    importlib.reload(job_portal.urls)
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec of the sync and async read views through the ASGI handler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adverts', type=int, default=500, help='Number of adverts to seed')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per view and mode')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+
+    def handle(self, *args, **options):
+        # The listing cache would otherwise answer every anonymous request after the first
+        with override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            self.run(options)
+
+    def run(self, options):
+        user, advert = self.seed(options['adverts'])
+        password = 'benchmark'
+        routes = {
+            'list_adverts': reverse('home'),
+            'search': reverse('search') + '?keyword=engineer',
+            'get_advert': reverse('job_advert', kwargs={'advert_id': advert.id}),
+            'my_applications': reverse('my_applications'),
+        }
+        try:
+            for async_views in (False, True):
+                with override_settings(ASYNC_VIEWS=async_views):
+                    reload_urlconf()
+                    mode = 'async' if async_views else 'sync'
+                    for name, url in routes.items():
+                        rate = asyncio.run(
+                            self.measure(url, user.email, password, options['requests'], options['concurrency'])
+                        )
+                        self.stdout.write(f'{name:16} {mode:5} {rate:8.1f} req/s')
+        finally:
+            reload_urlconf()
+            user.delete()
+
+    def seed(self, total: int) -> tuple[User, JobAdvert]:
+        user = User.objects.create_user(email=f'benchmark-{time.time_ns()}@example.com', password='benchmark')
+        deadline = timezone.now().date() + timedelta(days=30)
+        adverts = JobAdvert.objects.bulk_create([
+            JobAdvert(
+                title=f'Software Engineer {n}',
+                company_name=f'Company {n % 50}',
+                employment_type='Full Time',
+                experience_level='Mid Level',
+                description='Build and run web services',
+                job_type='Remote',
+                location='Kathmandu',
+                deadline=deadline,
+                skills='Python, Django',
+                created_by=user,
+            )
+            for n in range(total)
+        ])
+        JobApplication.objects.bulk_create([
+            JobApplication(name='Benchmark', email=user.email, portfolio_url='https://example.com',
+                           cv='cv/benchmark.pdf', job_advert=advert)
+            for advert in adverts[:25]
+        ])
+        # bulk_create skips the post_save signals that keep the search index and skills in sync
+        backend = get_search_backend()
+        for advert in adverts:
+            backend.index(advert)
+        JobAdvert.objects.filter(created_by=user).rebuild_skills()
+        return user, adverts[0]
+
+    async def measure(self, url: str, email: str, password: str, total: int, concurrency: int) -> float:
+        client = AsyncClient()
+        if url == reverse('my_applications'):
+            await client.alogin(email=email, password=password)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch():
+            async with semaphore:
+                response = await client.get(url)
+                assert response.status_code == 200, response.status_code
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(fetch() for _ in range(total)))
+        return total / (time.perf_counter() - started_at)
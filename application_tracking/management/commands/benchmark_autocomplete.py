@@ -0,0 +1,70 @@
+import random
+import string
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from application_tracking.autocomplete import KINDS, Autocomplete, fold_term
+
+
+class Command(BaseCommand):
+    help = 'Measure autocomplete lookups and updates against an in-memory index of synthetic terms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, default=1_000_000, help='Distinct terms across every kind')
+        parser.add_argument('--lookups', type=int, default=20000, help='Random prefixes to look up')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--max-p99-ms', type=float, default=1.0, help='Fail when the p99 lookup is slower')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        start = time.perf_counter()
+        terms = self.generate_terms(rng, options['terms'])
+        autocomplete = Autocomplete()
+        for kind, labels in zip(KINDS, (terms[kind::len(KINDS)] for kind in range(len(KINDS)))):
+            folded = {fold_term(label): label for label in labels}
+            autocomplete.indexes[kind].load(folded, Counter(dict.fromkeys(folded, 1)))
+        self.stdout.write(f'Indexed {len(terms)} terms in {time.perf_counter() - start:.1f}s')
+
+        prefixes = [self.prefix(rng, rng.choice(terms)) for _ in range(options['lookups'])]
+        timings, found = [], 0
+        for prefix in prefixes:
+            started = time.perf_counter()
+            found += len(autocomplete.suggest(prefix))
+            timings.append(time.perf_counter() - started)
+        p99 = self.report('lookup', timings)
+        self.stdout.write(f'{found / len(prefixes):.1f} suggestions per lookup')
+
+        updates = []
+        for label in rng.sample(terms, min(1000, len(terms))):
+            index = autocomplete.indexes[rng.choice(KINDS)]
+            started = time.perf_counter()
+            index.add(f'{label} ii')
+            index.discard(f'{label} ii')
+            updates.append(time.perf_counter() - started)
+        self.report('add+discard', updates)
+
+        if p99 > options['max_p99_ms']:
+            raise CommandError(f'p99 lookup {p99:.3f}ms is over the {options["max_p99_ms"]}ms budget')
+
+    def generate_terms(self, rng: random.Random, total: int) -> list[str]:
+        '''Distinct one to four word terms over a vocabulary sized like real titles and names'''
+        vocabulary = list({
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))).capitalize()
+            for _ in range(20000)
+        })
+        terms = set()
+        while len(terms) < total:
+            terms.add(' '.join(rng.choices(vocabulary, k=rng.randint(1, 4))))
+        return list(terms)
+
+    def prefix(self, rng: random.Random, term: str) -> str:
+        '''What a user has typed so far: the start of one of the words of a term'''
+        words = term.split()
+        typed = ' '.join(words[rng.randrange(len(words)):])
+        return typed[:rng.randint(1, 8)]
+
+    def report(self, name: str, timings: list[float]) -> float:
+        timings.sort()
+        p50, p99 = (timings[int(len(timings) * q)] * 1000 for q in (0.5, 0.99))
+        self.stdout.write(f'{name:12} p50={p50:.4f}ms p99={p99:.4f}ms max={timings[-1] * 1000:.4f}ms')
+        return p99
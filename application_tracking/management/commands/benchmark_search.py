@@ -0,0 +1,73 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+from accounts.models import User
+from application_tracking.models import JobAdvert
+from application_tracking.search import LikeSearchBackend, SQLiteFTS5Backend, get_search_backend
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare keyword search latency of the full-text index against the LIKE scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adverts', type=int, default=20000, help='Number of adverts to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per keyword')
+        parser.add_argument('--keywords', nargs='+', default=['python', 'manager', 'senior engineer', 'zzz'])
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options['adverts'])
+                self.run(options['keywords'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, total: int):
+        fake = Faker()
+        user = User.objects.create_user(email=f'benchmark-{time.time_ns()}@example.com', password='benchmark')
+        deadline = timezone.now().date() + timedelta(days=30)
+        skills = ['Python', 'Django', 'React', 'AWS', 'Docker', 'Go', 'SQL', 'Excel', 'Sales', 'Figma']
+        adverts = [
+            JobAdvert(
+                title=fake.job()[:150],
+                company_name=fake.company()[:150],
+                employment_type='Full Time',
+                experience_level='Mid Level',
+                description=fake.paragraph(nb_sentences=5),
+                job_type='Remote',
+                location=fake.city(),
+                deadline=deadline,
+                skills=', '.join(random.sample(skills, 3)),
+                created_by=user,
+            )
+            for _ in range(total)
+        ]
+        JobAdvert.objects.bulk_create(adverts, batch_size=2000)
+        get_search_backend().rebuild(JobAdvert.objects.all())
+        self.stdout.write(f'Seeded {total} adverts')
+
+    def run(self, keywords: list[str], repeat: int):
+        backends = [('like', LikeSearchBackend()), ('fts5', SQLiteFTS5Backend())]
+        for keyword in keywords:
+            for name, backend in backends:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    queryset = backend.filter(JobAdvert.objects.active(), keyword)
+                    total = queryset.count()
+                    list(queryset[:10])
+                    timings.append(time.perf_counter() - start)
+                timings.sort()
+                self.stdout.write(
+                    f'{keyword!r:20} {name:5} matches={total:<7} '
+                    f'median={timings[len(timings) // 2] * 1000:.2f}ms best={timings[0] * 1000:.2f}ms'
+                )
@@ -0,0 +1,218 @@
+import itertools
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+from accounts.models import User
+from application_tracking.enums import ApplicationStatus, EmploymentType, ExperienceLevel, LocationType
+from application_tracking.models import JobAdvert, JobApplication
+from application_tracking.search import get_search_backend
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+SEED_BATCH_SIZE = 5000
+# Distinct values Faker generates up front, rows pick from these so seeding a million rows stays fast
+POOL_SIZE = 2000
+SKILLS = ['Python', 'Django', 'React', 'AWS', 'Docker', 'Go', 'SQL', 'Excel', 'Sales', 'Figma', 'Kubernetes', 'Java']
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class Command(BaseCommand):
+    help = 'Time the main views through the test client at a given data scale and compare them with a JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, nargs='+', default=[10_000],
+                            help='Adverts and applications to seed, e.g. 10000 100000 1000000')
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per view')
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='JSON file of recorded results')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed p95 slowdown over the baseline, as a fraction')
+        parser.add_argument('--update-baseline', action='store_true', help='Record these results as the new baseline')
+
+    def handle(self, *args, **options):
+        baseline = json.loads(options['baseline'].read_text()) if options['baseline'].exists() else {}
+        results = {}
+        # cached pages, rate limits and real CV files would measure the cache, the limiter and the disk
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            RATE_LIMIT_ENABLED=False,
+            MEDIA_ROOT=media_root,
+        ):
+            for scale in options['scale']:
+                results[str(scale)] = self.benchmark(scale, options['requests'])
+
+        regressions = self.compare(results, baseline, options['threshold'])
+        if options['update_baseline'] or not baseline:
+            options['baseline'].parent.mkdir(parents=True, exist_ok=True)
+            options['baseline'].write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f'Baseline written to {options["baseline"]}')
+        elif regressions:
+            raise CommandError('Performance regressed:\n' + '\n'.join(regressions))
+
+    def benchmark(self, scale: int, requests: int) -> dict:
+        try:
+            with transaction.atomic():
+                started_at = time.perf_counter()
+                employer, advert = self.seed(scale)
+                self.stdout.write(f'Seeded {scale} adverts and applications in {time.perf_counter() - started_at:.1f}s')
+                results = self.run(employer, advert, requests)
+                raise Rollback
+        except Rollback:
+            pass
+        for view, result in results.items():
+            self.stdout.write(
+                f'{scale:>8} {view:20} p50={result["p50_ms"]:8.2f}ms p95={result["p95_ms"]:8.2f}ms '
+                f'queries={result["queries"]}'
+            )
+        return results
+
+    def seed(self, total: int) -> tuple[User, JobAdvert]:
+        '''Seed total adverts and total applications, one employer owning a share of both'''
+        fake = Faker()
+        titles = [fake.job()[:150] for _ in range(POOL_SIZE)]
+        companies = [fake.company()[:150] for _ in range(POOL_SIZE)]
+        cities = [fake.city() for _ in range(POOL_SIZE)]
+        descriptions = [fake.paragraph(nb_sentences=4) for _ in range(POOL_SIZE)]
+        names = [fake.name() for _ in range(POOL_SIZE)]
+
+        password = 'benchmark'
+        employers = User.objects.bulk_create(
+            User(email=f'employer-{n}-{time.time_ns()}@example.com') for n in range(max(total // 1000, 1))
+        )
+        employer = employers[0]
+        employer.set_password(password)
+        employer.save(update_fields=['password'])
+
+        today = timezone.now().date()
+        adverts = (
+            JobAdvert(
+                title=random.choice(titles),
+                company_name=random.choice(companies),
+                employment_type=random.choice(EmploymentType)[0],
+                experience_level=random.choice(ExperienceLevel)[0],
+                job_type=random.choice(LocationType)[0],
+                location=random.choice(cities),
+                description=random.choice(descriptions),
+                skills=', '.join(random.sample(SKILLS, 3)),
+                deadline=today + timedelta(days=random.randint(-30, 90)),
+                is_published=random.random() < 0.95,
+                created_by=employer if n % 100 == 0 else random.choice(employers),
+            )
+            for n in range(total)
+        )
+        for batch in iter(lambda: list(itertools.islice(adverts, SEED_BATCH_SIZE)), []):
+            JobAdvert.objects.bulk_create(batch)
+
+        advert = JobAdvert.objects.create(
+            title='Senior Python Engineer', company_name=companies[0], employment_type='Full Time',
+            experience_level='Senior Level', job_type='Remote', location=cities[0], description=descriptions[0],
+            skills='Python, Django, AWS', deadline=today + timedelta(days=30), created_by=employer,
+        )
+        advert_ids = list(JobAdvert.objects.values_list('pk', flat=True))
+        statuses = ApplicationStatus.values
+        # the busiest advert gets one application in a hundred, the rest are spread out
+        applications = (
+            JobApplication(
+                name=random.choice(names),
+                email=f'applicant{n}@example.com',
+                portfolio_url='https://example.com',
+                cv='cv/benchmark.pdf',
+                skills=', '.join(random.sample(SKILLS, random.randint(1, 5))),
+                status=random.choice(statuses),
+                job_advert_id=advert.pk if n % 100 == 0 else random.choice(advert_ids),
+            )
+            for n in range(total)
+        )
+        for batch in iter(lambda: list(itertools.islice(applications, SEED_BATCH_SIZE)), []):
+            JobApplication.objects.bulk_create(batch)
+
+        # bulk_create skips the save() and post_save work that keeps counters, skills and the search index current
+        JobAdvert.objects.all().recount_status_totals()
+        JobAdvert.objects.all().rebuild_skills()
+        advert.applications.all().rescore(advert.skills)
+        get_search_backend().rebuild(JobAdvert.objects.all())
+        return employer, advert
+
+    def run(self, employer: User, advert: JobAdvert, requests: int) -> dict:
+        anonymous, logged_in = Client(), Client()
+        logged_in.login(email=employer.email, password='benchmark')
+        apply_url = reverse('apply_for_job', kwargs={'advert_id': advert.id})
+        applicants = itertools.count()
+
+        def apply():
+            return anonymous.post(apply_url, {
+                'name': 'Benchmark Applicant',
+                'email': f'benchmark-{next(applicants)}@example.com',
+                'portfolio_url': 'https://example.com',
+                'cv': SimpleUploadedFile('cv.pdf', b'%PDF-1.4 benchmark', content_type='application/pdf'),
+            })
+
+        views = {
+            'list_adverts': lambda: anonymous.get(reverse('home')),
+            'search': lambda: anonymous.get(reverse('search'), {'keyword': 'engineer', 'location': ''}),
+            'get_advert': lambda: anonymous.get(reverse('job_advert', kwargs={'advert_id': advert.id})),
+            'my_jobs': lambda: logged_in.get(reverse('my_jobs')),
+            'advert_applications': lambda: logged_in.get(
+                reverse('advert_applications', kwargs={'advert_id': advert.id})
+            ),
+            'applications_by_score': lambda: logged_in.get(
+                reverse('advert_applications', kwargs={'advert_id': advert.id}), {'sort': 'score'}
+            ),
+            'apply': apply,
+        }
+        return {name: self.measure(name, request, requests) for name, request in views.items()}
+
+    def measure(self, name: str, request, requests: int) -> dict:
+        request()  # warm up template and query caches
+        timings, queries = [], 0
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                started_at = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - started_at) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{name} returned {response.status_code}')
+            queries = max(queries, len(captured))
+        return {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'queries': queries,
+        }
+
+    def compare(self, results: dict, baseline: dict, threshold: float) -> list[str]:
+        '''A view regresses when it runs more queries than recorded or its p95 grows beyond the threshold'''
+        regressions = []
+        for scale, views in results.items():
+            for view, result in views.items():
+                recorded = baseline.get(scale, {}).get(view)
+                if recorded is None:
+                    continue
+                if result['queries'] > recorded['queries']:
+                    regressions.append(
+                        f'{scale} {view}: {result["queries"]} queries, baseline {recorded["queries"]}'
+                    )
+                if result['p95_ms'] > recorded['p95_ms'] * (1 + threshold):
+                    regressions.append(
+                        f'{scale} {view}: p95 {result["p95_ms"]:.2f}ms, baseline {recorded["p95_ms"]:.2f}ms'
+                    )
+        return regressions
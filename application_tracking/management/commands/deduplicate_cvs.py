@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from application_tracking.models import CVBlob, JobApplication
+
+CONTENT_ADDRESSED_NAME = r'/[0-9a-f]{2}/[0-9a-f]{64}(\.[^/]*)?$'
+
+
+class Command(BaseCommand):
+    help = 'Move CVs uploaded before content-addressed storage under their digest, merging identical files'
+
+    def handle(self, *args, **options):
+        storage = JobApplication._meta.get_field('cv').storage
+        moved = freed = 0
+        for blob in CVBlob.objects.exclude(name__regex=CONTENT_ADDRESSED_NAME).iterator():
+            if not storage.exists(blob.name):
+                self.stderr.write(f'Skipping {blob.name}: file is missing')
+                continue
+
+            size = storage.size(blob.name)
+            with storage.open(blob.name, 'rb') as content:
+                merged = storage.exists(storage.content_name(blob.name, content))
+                new_name = storage.save(blob.name, content)
+
+            with transaction.atomic():
+                JobApplication.objects.filter(cv=blob.name).update(cv=new_name)
+                target, _ = CVBlob.objects.get_or_create(name=new_name)
+                CVBlob.objects.filter(pk=target.pk).update(
+                    reference_count=F('reference_count') + blob.reference_count
+                )
+                blob.delete()
+            storage.delete(blob.name)
+
+            moved += 1
+            if merged:
+                freed += size
+
+        self.stdout.write(self.style.SUCCESS(f'Moved {moved} CVs, freeing {freed} bytes of duplicates'))
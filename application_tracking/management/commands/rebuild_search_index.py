@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from application_tracking.models import JobAdvert
+from application_tracking.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the job advert full-text search index from the adverts table'
+
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild(JobAdvert.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} adverts'))
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from application_tracking.models import JobAdvert, SimilarAdvert
+
+
+class Command(BaseCommand):
+    help = 'Recompute the "similar jobs" neighbour table of active adverts, as the nightly task does'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-k', type=int, default=10, help='Neighbours to keep per advert')
+        parser.add_argument('--block-size', type=int, default=1000, help='Adverts written per transaction')
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+        written = SimilarAdvert.objects.rebuild(
+            JobAdvert.objects.active(), k=options['k'], block_size=options['block_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {written} neighbours in {time.perf_counter() - started_at:.1f}s'
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from application_tracking.models import JobAdvert
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-status application counters stored on every job advert'
+
+    def handle(self, *args, **options):
+        count = JobAdvert.objects.all().recount_status_totals()
+        self.stdout.write(self.style.SUCCESS(f'Recounted {count} adverts'))
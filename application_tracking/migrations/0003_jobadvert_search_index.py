@@ -0,0 +1,39 @@
+from django.db import migrations
+
+FTS_TABLE = 'application_tracking_jobadvert_fts'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+        'advert_id UNINDEXED, title, company_name, description, skills, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    JobAdvert = apps.get_model('application_tracking', 'JobAdvert')
+    rows = JobAdvert.objects.values_list('id', 'title', 'company_name', 'description', 'skills')
+    with schema_editor.connection.cursor() as cursor:
+        for advert_id, *fields in rows.iterator(chunk_size=2000):
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, advert_id, title, company_name, description, skills) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                [advert_id.int >> 65, advert_id.hex] + fields
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0002_jobadvert_salary_alter_jobadvert_job_type_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
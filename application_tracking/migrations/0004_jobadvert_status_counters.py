@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+STATUS_COUNTERS = {
+    'APPLIED': 'applied_count',
+    'INTERVIEW': 'interview_count',
+    'REJECTED': 'rejected_count',
+    'HIRED': 'hired_count',
+}
+
+
+def backfill_status_counters(apps, schema_editor):
+    JobAdvert = apps.get_model('application_tracking', 'JobAdvert')
+    JobApplication = apps.get_model('application_tracking', 'JobApplication')
+    JobApplication.objects.filter(status='INTERVIEWE').update(status='INTERVIEW')
+
+    totals = {}
+    for status, field in STATUS_COUNTERS.items():
+        applicants = (
+            JobApplication.objects.filter(job_advert=OuterRef('pk'), status=status)
+            .order_by()
+            .values('job_advert')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        totals[field] = Coalesce(Subquery(applicants), 0)
+    JobAdvert.objects.update(**totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0003_jobadvert_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobadvert',
+            name='applied_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobadvert',
+            name='hired_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobadvert',
+            name='interview_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobadvert',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='status',
+            field=models.CharField(choices=[('APPLIED', 'APPLIED'), ('INTERVIEW', 'INTERVIEW'), ('REJECTED', 'REJECTED'), ('HIRED', 'HIRED')], default='APPLIED', max_length=50),
+        ),
+        migrations.RunPython(backfill_status_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:03
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0004_jobadvert_status_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobadvert',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['deadline'], name='advert_active_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobadvert',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at', '-id'], name='advert_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['email'], name='application_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(models.F('job_advert'), django.db.models.functions.text.Lower('email'), name='application_advert_email_idx'),
+        ),
+    ]
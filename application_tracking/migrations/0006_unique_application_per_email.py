@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:15
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Lower
+
+STATUS_COUNTERS = {
+    'APPLIED': 'applied_count',
+    'INTERVIEW': 'interview_count',
+    'REJECTED': 'rejected_count',
+    'HIRED': 'hired_count',
+}
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    '''Keep the earliest application per advert and email so the unique constraint can be created'''
+    JobAdvert = apps.get_model('application_tracking', 'JobAdvert')
+    JobApplication = apps.get_model('application_tracking', 'JobApplication')
+    duplicates = (
+        JobApplication.objects.annotate(email_lower=Lower('email'))
+        .values('job_advert', 'email_lower')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=1)
+    )
+    affected = set()
+    for group in duplicates.iterator():
+        applications = JobApplication.objects.alias(email_lower=Lower('email')).filter(
+            job_advert=group['job_advert'], email_lower=group['email_lower']
+        ).order_by('created_at', 'id')
+        keep = applications.values_list('pk', flat=True)[0]
+        applications.exclude(pk=keep).delete()
+        affected.add(group['job_advert'])
+
+    if not affected:
+        return
+    totals = {}
+    for status, field in STATUS_COUNTERS.items():
+        applicants = (
+            JobApplication.objects.filter(job_advert=OuterRef('pk'), status=status)
+            .order_by()
+            .values('job_advert')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        totals[field] = Coalesce(Subquery(applicants), 0)
+    JobAdvert.objects.filter(pk__in=affected).update(**totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0005_hot_queryset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='jobapplication',
+            name='application_advert_email_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(models.F('job_advert'), django.db.models.functions.text.Lower('email'), name='unique_application_per_email'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:24
+
+import application_tracking.storage
+import uuid
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_cv_blobs(apps, schema_editor):
+    '''Existing CVs each get a reference count, so deleting their applications cleans them up too'''
+    CVBlob = apps.get_model('application_tracking', 'CVBlob')
+    JobApplication = apps.get_model('application_tracking', 'JobApplication')
+    references = JobApplication.objects.exclude(cv='').order_by().values('cv').annotate(total=Count('pk'))
+    CVBlob.objects.bulk_create(
+        (CVBlob(name=row['cv'], reference_count=row['total']) for row in references.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0006_unique_application_per_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVBlob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('reference_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='cv',
+            field=models.FileField(storage=application_tracking.storage.ContentAddressedStorage(), upload_to='cv/'),
+        ),
+        migrations.RunPython(backfill_cv_blobs, migrations.RunPython.noop),
+    ]
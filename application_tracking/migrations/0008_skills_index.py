@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from application_tracking.skills import backfill_skills
+
+
+def backfill_advert_skills(apps, schema_editor):
+    '''Parse the skills text of existing adverts into the index, a thousand adverts at a time'''
+    JobAdvert = apps.get_model('application_tracking', 'JobAdvert')
+    Skill = apps.get_model('application_tracking', 'Skill')
+    AdvertSkill = apps.get_model('application_tracking', 'AdvertSkill')
+    backfill_skills(JobAdvert.objects.all(), Skill, AdvertSkill)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0007_content_addressed_cvs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('label', models.CharField(max_length=100)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AdvertSkill',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('job_advert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='advert_skills', to='application_tracking.jobadvert')),
+                ('skill', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='advert_skills', to='application_tracking.skill')),
+            ],
+            options={
+                'ordering': ('position',),
+            },
+        ),
+        migrations.AddField(
+            model_name='jobadvert',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='adverts', through='application_tracking.AdvertSkill', to='application_tracking.skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='advertskill',
+            constraint=models.UniqueConstraint(fields=('skill', 'job_advert'), name='unique_advert_skill'),
+        ),
+        migrations.RunPython(backfill_advert_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0008_skills_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='match_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='skills',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job_advert', '-match_score', '-created_at'], name='application_advert_score_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:02
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application_tracking', '0009_application_match_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarAdvert',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('advert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='application_tracking.jobadvert')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='application_tracking.jobadvert')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('advert', 'rank'), name='unique_neighbour_rank')],
+            },
+        ),
+    ]
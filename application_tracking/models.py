@@ -1,31 +1,104 @@
-from django.db import models
+from collections import Counter
+from django.db import IntegrityError, models, transaction
 from common.models import BaseModel
 from accounts.models import User
 from .enums import EmploymentType, ExperienceLevel, LocationType, ApplicationStatus
 from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, Count, Exists, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce, Greatest, Lower
+from .search import get_search_backend
+from .facets import FACETS, SALARY_BAND, fold_counts, salary_band_case, salary_band_filter
+from .skills import (
+    SKILL_NAME_LENGTH, backfill_skills, index_skills, match_scores, normalize_skill, parse_skills, skill_vector,
+)
+from .similarity import TfidfIndex
+from .storage import ContentAddressedStorage
 
 class JobAdvertQuerySet(models.QuerySet):
     def active(self):
         return self.filter(is_published=True, deadline__gte=timezone.now().date())
     
-    def search(self, keyword, location):
+    def search(self, keyword, location, skills=()):
         
         query = Q()
 
-        if keyword:
-            query &= (
-                Q(title__icontains=keyword) 
-                | Q(company_name__icontains=keyword)
-                | Q(description__icontains=keyword)
-                | Q(skills__icontains=keyword)
-            )
-
         if location:
             query &= Q(location__icontains=location)
 
-        return self.active().filter(query)
+        result = self.active().filter(query).with_skills(skills)
+
+        if keyword:
+            result = get_search_backend().filter(result, keyword)
+
+        return result
+
+    def with_skills(self, skills):
+        '''Adverts listing every one of skills, matched exactly on the canonical name'''
+        result = self
+        for name in sorted({normalize_skill(skill) for skill in skills} - {''}):
+            result = result.filter(Exists(AdvertSkill.objects.filter(job_advert=OuterRef('pk'), skill__name=name)))
+        return result
+
+    def similar_to(self, advert: 'JobAdvert'):
+        '''Precomputed neighbours of advert, most similar first, read through the (advert, rank) index'''
+        return self.filter(neighbour_of__advert=advert).order_by('neighbour_of__rank')
+
+    def rebuild_skills(self, batch_size: int = 1000) -> int:
+        '''Re-parse the skills text of adverts written without save(), e.g. by bulk_create'''
+        return backfill_skills(self, Skill, AdvertSkill, batch_size)
+
+    def prefetch_skills(self):
+        '''Load the skills of every advert in one extra query, for JobAdvert.skills_list'''
+        return self.prefetch_related(
+            Prefetch('advert_skills', queryset=AdvertSkill.objects.select_related('skill'))
+        )
+
+    def filter_facets(self, selected: dict[str, list[str]]):
+        '''Keep adverts matching any selected value of every facet that has a selection'''
+        query = Q()
+        for name, values in selected.items():
+            query &= salary_band_filter(values) if name == SALARY_BAND else Q(**{f'{name}__in': values})
+        return self.filter(query)
+
+    def facet_rows(self):
+        '''One row per combination of facet values present, with its advert count'''
+        return (
+            self.order_by()
+            .annotate(**{SALARY_BAND: salary_band_case()})
+            .values(*FACETS)
+            .annotate(count=Count('pk'))
+        )
+
+    def facet_counts(self, selected: dict[str, list[str]] | None = None) -> dict[str, dict[str, int]]:
+        return fold_counts(self.facet_rows(), selected or {})
+
+    async def afacet_counts(self, selected: dict[str, list[str]] | None = None) -> dict[str, dict[str, int]]:
+        return fold_counts([row async for row in self.facet_rows()], selected or {})
+
+    def with_total_applicants(self):
+        applicants = (
+            JobApplication.objects.filter(job_advert=OuterRef('pk'))
+            .order_by()
+            .values('job_advert')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return self.annotate(applicants_count=Coalesce(Subquery(applicants), 0))
+
+    def recount_status_totals(self) -> int:
+        '''Recompute the per-status counters from the applications table in a single UPDATE'''
+        totals = {}
+        for status, field in JobAdvert.STATUS_COUNTERS.items():
+            applicants = (
+                JobApplication.objects.filter(job_advert=OuterRef('pk'), status=status)
+                .order_by()
+                .values('job_advert')
+                .annotate(count=Count('pk'))
+                .values('count')
+            )
+            totals[field] = Coalesce(Subquery(applicants), 0)
+        return self.update(**totals)
         
 
 class JobAdvert(BaseModel):
@@ -40,30 +113,277 @@ class JobAdvert(BaseModel):
     is_published = models.BooleanField(default=True)
     deadline = models.DateField()
     skills = models.CharField(max_length=255)
+    skill_tags = models.ManyToManyField('Skill', through='AdvertSkill', related_name='adverts', blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    applied_count = models.PositiveIntegerField(default=0)
+    interview_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    hired_count = models.PositiveIntegerField(default=0)
     
     objects = JobAdvertQuerySet.as_manager()
 
+    STATUS_COUNTERS = {
+        ApplicationStatus.APPLIED: 'applied_count',
+        ApplicationStatus.INTERVIEW: 'interview_count',
+        ApplicationStatus.REJECTED: 'rejected_count',
+        ApplicationStatus.HIRED: 'hired_count',
+    }
+
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['deadline'], condition=Q(is_published=True), name='advert_active_deadline_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(is_published=True), name='advert_active_recent_idx'),
+        ]
         
+    def save(self, *args, **kwargs):
+        # The status counters are only ever changed through F() updates, so a full save of a
+        # previously loaded advert must not write back its stale copy of them.
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STATUS_COUNTERS.values()
+            ]
+        super().save(*args, **kwargs)
+
     def publish_advert(self) -> None:
         self.is_published = True
         self.save(update_fields=['is_published'])
         
         
+    def sync_skills(self) -> None:
+        '''Bring the advert's rows in the skills index, and its applicants' scores, in line with its skills text'''
+        names = [name for name, _ in parse_skills(self.skills)]
+        indexed = list(
+            AdvertSkill.objects.filter(job_advert=self).order_by('position').values_list('skill__name', flat=True)
+        )
+        if names == indexed:
+            return
+        index_skills([(self.pk, self.skills)], Skill, AdvertSkill)
+        # scores only depend on which skills are asked for, not on their order
+        if set(names) != set(indexed):
+            self.applications.all().rescore(self.skills)
+
+    @property
+    def skills_list(self) -> list[str]:
+        return [advert_skill.skill.label for advert_skill in self.advert_skills.all()]
+
     @property
     def total_applicants(self) -> int:
+        if hasattr(self, 'applicants_count'):
+            return self.applicants_count
         return self.applications.count()
+
+    def record_status_change(self, old_status: str | None, new_status: str) -> None:
+        '''Move one application between status counters with an atomic UPDATE'''
+        self.record_status_changes([old_status], new_status)
+
+    def record_status_changes(self, old_statuses: list[str | None], new_status: str) -> None:
+        '''Move several applications to new_status in one UPDATE; None stands for a new application'''
+        moved = Counter(status for status in old_statuses if status != new_status)
+        total = sum(moved.values())
+        if not total:
+            return
+        new_field = self.STATUS_COUNTERS[new_status]
+        changes = {new_field: F(new_field) + total}
+        for old_status, count in moved.items():
+            if old_status:
+                old_field = self.STATUS_COUNTERS[old_status]
+                changes[old_field] = Greatest(F(old_field) - count, 0)
+        JobAdvert.objects.filter(pk=self.pk).update(**changes)
     
+    @property
+    def time_left(self) -> str:
+        if not self.deadline:
+            return "No deadline"
+        days = (self.deadline - timezone.now().date()).days
+        if days > 30:
+            return f"{days // 30} months left"
+        if days > 0:
+            return f"{days} days left"
+        if days == 0:
+            return "Today"
+        return "Expired"
+
     def get_absolute_url(self):
         return reverse("job_advert", kwargs={"advert_id": self.id})
     
         
+class Skill(BaseModel):
+    '''A skill adverts ask for, stored once under its case-folded name'''
+    name = models.CharField(max_length=SKILL_NAME_LENGTH, unique=True)
+    label = models.CharField(max_length=SKILL_NAME_LENGTH)
+
+    def __str__(self):
+        return self.label
+
+
+class AdvertSkill(BaseModel):
+    job_advert = models.ForeignKey(JobAdvert, related_name='advert_skills', on_delete=models.CASCADE)
+    # the unique (skill, job_advert) index below serves lookups by skill
+    skill = models.ForeignKey(Skill, related_name='advert_skills', on_delete=models.CASCADE, db_index=False)
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ('position',)
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'job_advert'], name='unique_advert_skill'),
+        ]
+
+
+class SimilarAdvertQuerySet(models.QuerySet):
+    def rebuild(self, adverts, k: int = 10, block_size: int = 1000, **index_options) -> int:
+        """
+        Replace the table with the k nearest neighbours of every advert in adverts, one block of
+        adverts per transaction, so readers never find an advert without neighbours mid-rebuild.
+        Rows of adverts left out of adverts are dropped at the end. Returns the rows written.
+        """
+        started_at = timezone.now()
+        index = TfidfIndex.build(adverts, **index_options)
+        written = 0
+        for start in range(0, len(index), block_size):
+            block = range(start, min(start + block_size, len(index)))
+            rows = [
+                SimilarAdvert(
+                    advert_id=index.ids[advert], neighbour_id=index.ids[other], rank=rank, score=round(score, 4),
+                )
+                for advert in block
+                for rank, (other, score) in enumerate(index.neighbours(advert, k))
+            ]
+            with transaction.atomic():
+                self.filter(advert_id__in=[index.ids[advert] for advert in block]).delete()
+                self.bulk_create(rows)
+            written += len(rows)
+        self.filter(created_at__lt=started_at).delete()
+        return written
+
+
+class SimilarAdvert(BaseModel):
+    '''One of the nearest neighbours of an advert, rebuilt nightly by rebuild_similar_adverts'''
+    advert = models.ForeignKey(JobAdvert, related_name='neighbours', on_delete=models.CASCADE)
+    neighbour = models.ForeignKey(JobAdvert, related_name='neighbour_of', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    objects = SimilarAdvertQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['advert', 'rank'], name='unique_neighbour_rank'),
+        ]
+
+
+class JobApplicationQuerySet(models.QuerySet):
+    def with_advert_totals(self):
+        applicants = (
+            JobApplication.objects.filter(job_advert=OuterRef('job_advert'))
+            .order_by()
+            .values('job_advert')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return self.select_related('job_advert').annotate(
+            advert_total_applicants=Coalesce(Subquery(applicants), 0)
+        )
+
+    def rescore(self, required_skills: str, batch_size: int = 1000) -> int:
+        '''Recompute match scores against required_skills in batches, writing only those that changed'''
+        required = skill_vector(required_skills)
+        rows = self.order_by('pk').values_list('pk', 'skills', 'match_score')
+        changed, last_pk = 0, None
+        while batch := list((rows.filter(pk__gt=last_pk) if last_pk else rows)[:batch_size]):
+            scores = match_scores(required, [skill_vector(skills) for _, skills, _ in batch])
+            updates = [
+                JobApplication(pk=pk, match_score=score)
+                for (pk, _, old_score), score in zip(batch, scores) if score != old_score
+            ]
+            JobApplication.objects.bulk_update(updates, ['match_score'])
+            changed += len(updates)
+            last_pk = batch[-1][0]
+        return changed
+
+
 class JobApplication(BaseModel):
     name = models.CharField(max_length=150)
     email = models.EmailField()
     portfolio_url = models.URLField()
-    cv = models.FileField(upload_to='cv/')
+    cv = models.FileField(upload_to='cv/', storage=ContentAddressedStorage())
+    skills = models.CharField(max_length=255, blank=True)
+    match_score = models.FloatField(default=0)
     status = models.CharField(max_length=50, choices=ApplicationStatus.choices, default=ApplicationStatus.APPLIED)
-    job_advert = models.ForeignKey(JobAdvert, related_name='applications', on_delete=models.CASCADE)
\ No newline at end of file
+    job_advert = models.ForeignKey(JobAdvert, related_name='applications', on_delete=models.CASCADE)
+
+    objects = JobApplicationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['email'], name='application_email_idx'),
+            models.Index(fields=['job_advert', '-match_score', '-created_at'], name='application_advert_score_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint('job_advert', Lower('email'), name='unique_application_per_email'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # a new applicant is scored on their own, existing scores only change with the advert's skills
+        self.match_score = match_scores(skill_vector(self.job_advert.skills), [skill_vector(self.skills)])[0]
+        if not self.cv:
+            return super().save(*args, **kwargs)
+        # Count the reference before the storage looks for an identical file, in the same transaction,
+        # so CVBlob.objects.collect() cannot delete a shared file this application is about to point at.
+        with transaction.atomic():
+            CVBlob.objects.acquire(self.stored_cv_name())
+            super().save(*args, **kwargs)
+
+    def stored_cv_name(self) -> str:
+        '''Name the CV has, or will have once saved, in its content-addressed storage'''
+        if self.cv._committed:
+            return self.cv.name
+        field = self._meta.get_field('cv')
+        return field.storage.content_name(field.generate_filename(self, self.cv.name), self.cv.file)
+
+class CVBlobQuerySet(models.QuerySet):
+    def acquire(self, name: str) -> None:
+        '''Count one more application pointing at the stored file'''
+        if self.filter(name=name).update(reference_count=F('reference_count') + 1):
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, reference_count=1)
+        except IntegrityError:
+            self.filter(name=name).update(reference_count=F('reference_count') + 1)
+
+    def release(self, name: str) -> bool:
+        '''Count one application fewer, returning True once nothing references the file any more'''
+        self.filter(name=name).update(reference_count=Greatest(F('reference_count') - 1, 0))
+        # the row stays at zero for collect() to lock, a new reference may still arrive before it runs
+        return self.filter(name=name, reference_count=0).exists()
+
+    def collect(self, storage, name: str) -> None:
+        """
+        Delete the stored file and its row if no application references it. The row is locked, or
+        created at zero when missing, until the file is gone, so an application acquiring the same
+        name either counts before the check and keeps the file, or waits and writes it again.
+        """
+        with transaction.atomic():
+            blob, _ = self.select_for_update().get_or_create(name=name)
+            if blob.reference_count:
+                return
+            storage.delete(name)
+            blob.delete()
+
+
+class CVBlob(BaseModel):
+    """
+    Reference count for a file in ContentAddressedStorage. Identical CVs share one file,
+    which is deleted when the last application using it goes away.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    reference_count = models.PositiveIntegerField(default=0)
+
+    objects = CVBlobQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.name} ({self.reference_count})'
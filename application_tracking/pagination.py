@@ -0,0 +1,117 @@
+import base64
+import binascii
+import collections.abc
+import json
+import uuid
+from datetime import datetime
+from django.core.paginator import Page, Paginator
+from django.db.models import Q, QuerySet
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage(collections.abc.Sequence):
+    """
+    One page of a CursorPaginator. Unlike django.core.paginator.Page it has no page numbers
+    and no total count, only opaque cursors to the neighbouring pages.
+    """
+
+    def __init__(self, object_list: list, next_cursor: str | None, previous_cursor: str | None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over (created_at, id), newest first, matching JobAdvert.Meta.ordering.
+    Each page is a single LIMIT query seeking past the cursor row, so deep pages cost the
+    same as the first one and no COUNT(*) is ever run.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(direction: str, obj) -> str:
+        payload = json.dumps([direction, obj.created_at.isoformat(), obj.pk.hex])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[str, datetime, uuid.UUID] | None:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in (NEXT, PREVIOUS):
+                return None
+            return direction, datetime.fromisoformat(created_at), uuid.UUID(pk)
+        except (binascii.Error, ValueError, TypeError):
+            return None
+
+    def get_page(self, cursor: str | None) -> CursorPage:
+        '''Return the page after (or before) the cursor, or the first page if the cursor is missing or invalid'''
+        rows, direction = self._page_query(cursor)
+        return self._page(list(rows), direction)
+
+    async def aget_page(self, cursor: str | None) -> CursorPage:
+        rows, direction = self._page_query(cursor)
+        return self._page([obj async for obj in rows], direction)
+
+    def _page_query(self, cursor: str | None) -> tuple[QuerySet, str | None]:
+        position = self.decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self.queryset.order_by('-created_at', '-id')[:self.per_page + 1], None
+
+        direction, created_at, pk = position
+        if direction == NEXT:
+            rows = (
+                self.queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+                .order_by('-created_at', '-id')
+            )
+        else:
+            rows = (
+                self.queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+                .order_by('created_at', 'id')
+            )
+        return rows[:self.per_page + 1], direction
+
+    def _page(self, rows: list, direction: str | None) -> CursorPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows = rows[::-1]
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, direction == NEXT
+
+        next_cursor = self.encode_cursor(NEXT, rows[-1]) if rows and has_next else None
+        previous_cursor = self.encode_cursor(PREVIOUS, rows[0]) if rows and has_previous else None
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+
+async def aget_page(paginator: Paginator, number) -> Page:
+    """
+    Async counterpart of Paginator.get_page: the COUNT and the page query run on the
+    async ORM and the returned page holds a list, so rendering it touches no database.
+    """
+    paginator.count = await paginator.object_list.acount()
+    page = paginator.get_page(number)
+    page.object_list = [obj async for obj in page.object_list]
+    return page
@@ -0,0 +1,130 @@
+import itertools
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+FTS_TABLE = 'application_tracking_jobadvert_fts'
+INDEXED_FIELDS = ('title', 'company_name', 'description', 'skills')
+
+TERM_PATTERN = re.compile(r'\w+')
+
+
+class SearchBackend:
+    """
+    Base class for the keyword search used by JobAdvertQuerySet.search.
+    Subclasses keep their index in sync through index/remove and narrow a queryset through filter.
+    """
+
+    def index(self, advert) -> None:
+        pass
+
+    def remove(self, advert_id) -> None:
+        pass
+
+    def rebuild(self, queryset) -> int:
+        count = 0
+        for advert in queryset.iterator(chunk_size=2000):
+            self.index(advert)
+            count += 1
+        return count
+
+    def filter(self, queryset, keyword: str):
+        raise NotImplementedError
+
+
+class LikeSearchBackend(SearchBackend):
+    """
+    Substring match over the indexed fields. Works on every database but scans the whole table.
+    """
+
+    def filter(self, queryset, keyword: str):
+        query = Q()
+        for field in INDEXED_FIELDS:
+            query |= Q(**{f'{field}__icontains': keyword})
+        return queryset.filter(query)
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    Full-text search over an FTS5 virtual table, ranked by bm25 relevance.
+    The table is created by migration 0003 and holds one row per advert, joined back on advert_id.
+    """
+
+    @staticmethod
+    def index_rowid(advert_id) -> int:
+        '''Stable FTS rowid derived from the advert UUID so updates and deletes never scan the index'''
+        return advert_id.int >> 65
+
+    def index(self, advert) -> None:
+        from .models import JobAdvert
+        rowid = self.index_rowid(advert.pk)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [rowid])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, advert_id, title, company_name, description, skills) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                [rowid, JobAdvert._meta.pk.get_db_prep_value(advert.pk, connection)]
+                + [getattr(advert, field) or '' for field in INDEXED_FIELDS]
+            )
+
+    def remove(self, advert_id) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [self.index_rowid(advert_id)])
+
+    def rebuild(self, queryset) -> int:
+        '''Refill the whole index with one executemany per 2000 adverts'''
+        from .models import JobAdvert
+        pk_field = JobAdvert._meta.pk
+        count = 0
+        rows = queryset.order_by().values_list('pk', *INDEXED_FIELDS).iterator(chunk_size=2000)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            while batch := list(itertools.islice(rows, 2000)):
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, advert_id, title, company_name, description, skills) '
+                    'VALUES (%s, %s, %s, %s, %s, %s)',
+                    [
+                        [self.index_rowid(pk), pk_field.get_db_prep_value(pk, connection)]
+                        + [value or '' for value in values]
+                        for pk, *values in batch
+                    ],
+                )
+                count += len(batch)
+        return count
+
+    @staticmethod
+    def build_match_query(keyword: str) -> str:
+        '''Turn free text into an FTS5 query: every term must match, each as a prefix'''
+        terms = TERM_PATTERN.findall(keyword)
+        return ' '.join('"{}"*'.format(term) for term in terms)
+
+    def filter(self, queryset, keyword: str):
+        match_query = self.build_match_query(keyword)
+        if not match_query:
+            return queryset
+        advert_table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.advert_id = {advert_table}.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match_query],
+            select={'search_rank': f'bm25({FTS_TABLE})'},
+            order_by=['search_rank', '-created_at'],
+        )
+
+
+def get_search_backend() -> SearchBackend:
+    """
+    Return the backend named by settings.JOB_SEARCH_BACKEND.
+    Without the setting, SQLite gets FTS5 and every other database falls back to LIKE.
+    """
+    backend_path = getattr(settings, 'JOB_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    return LikeSearchBackend()
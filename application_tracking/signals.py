@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import CVBlob, JobAdvert, JobApplication
+from .search import get_search_backend
+from .cache import bump_listing_version
+from . import autocomplete
+from .tasks import refresh_feed
+
+
+@receiver(post_save, sender=JobAdvert)
+def index_job_advert(sender, instance: JobAdvert, **kwargs):
+    get_search_backend().index(instance)
+
+
+@receiver(post_save, sender=JobAdvert)
+def sync_advert_skills(sender, instance: JobAdvert, update_fields=None, **kwargs):
+    if update_fields is None or 'skills' in update_fields:
+        instance.sync_skills()
+
+
+@receiver(post_delete, sender=JobAdvert)
+def unindex_job_advert(sender, instance: JobAdvert, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=JobAdvert)
+@receiver(post_delete, sender=JobAdvert)
+def invalidate_listing_cache(sender, instance: JobAdvert, **kwargs):
+    transaction.on_commit(bump_listing_version)
+
+
+@receiver(post_save, sender=JobAdvert)
+def update_autocomplete(sender, instance: JobAdvert, **kwargs):
+    transaction.on_commit(lambda: autocomplete.update_advert(instance))
+
+
+@receiver(post_delete, sender=JobAdvert)
+def remove_from_autocomplete(sender, instance: JobAdvert, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.remove_advert(pk))
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_cv(sender, instance: JobApplication, **kwargs):
+    if instance.cv and CVBlob.objects.release(instance.cv.name):
+        storage, name = instance.cv.storage, instance.cv.name
+        transaction.on_commit(lambda: CVBlob.objects.collect(storage, name))
+
+
+@receiver(post_save, sender=JobApplication)
+def refresh_applicant_feed(sender, instance: JobApplication, created: bool, **kwargs):
+    if created:
+        # the application is saved either way, an unreachable broker only delays the feed to the nightly run
+        transaction.on_commit(lambda: refresh_feed.delay(instance.email), robust=True)
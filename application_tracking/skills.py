@@ -0,0 +1,82 @@
+"""
+Parsing of the comma-separated skills employers and applicants type into canonical skill names,
+the Skill / AdvertSkill rows built from them, and the skill match scores of applications.
+"python", " Python " and "PYTHON" are one skill, "Java" and "JavaScript" are two.
+
+The helpers take the model classes as arguments so migrations can run them on historical models.
+"""
+import math
+import re
+
+SKILL_NAME_LENGTH = 100
+
+
+def normalize_skill(label: str) -> str:
+    '''Canonical, case-folded name a skill is stored and looked up under'''
+    return re.sub(r'\s+', ' ', label).strip().casefold()[:SKILL_NAME_LENGTH]
+
+
+def parse_skills(text: str | None) -> list[tuple[str, str]]:
+    '''(name, label) pairs in the order written, duplicates and blanks dropped'''
+    skills = {}
+    for label in (text or '').split(','):
+        label = re.sub(r'\s+', ' ', label).strip()[:SKILL_NAME_LENGTH]
+        name = normalize_skill(label)
+        if name and name not in skills:
+            skills[name] = label
+    return list(skills.items())
+
+
+def skill_vector(text: str | None) -> dict[str, float]:
+    '''Sparse unit vector with one dimension per skill in text'''
+    names = [name for name, _ in parse_skills(text)]
+    if not names:
+        return {}
+    return dict.fromkeys(names, 1 / math.sqrt(len(names)))
+
+
+def match_scores(required: dict[str, float], vectors: list[dict[str, float]]) -> list[float]:
+    """
+    Cosine similarity of each vector with the required skills, from 0 (nothing in common)
+    to 1 (exactly the required skills). Listing many unrelated skills lowers the score.
+    """
+    if not required:
+        return [0.0] * len(vectors)
+    return [
+        round(sum(weight * required.get(name, 0.0) for name, weight in vector.items()), 4)
+        for vector in vectors
+    ]
+
+
+def index_skills(adverts: list[tuple], skill_model, advert_skill_model) -> None:
+    '''Replace the skill rows of (advert id, skills text) pairs, creating skills not seen before'''
+    parsed = {pk: parse_skills(text) for pk, text in adverts}
+    labels = {}
+    for skills in parsed.values():
+        for name, label in skills:
+            labels.setdefault(name, label)
+
+    skill_model.objects.bulk_create(
+        [skill_model(name=name, label=label) for name, label in labels.items()], ignore_conflicts=True,
+    )
+    skill_ids = dict(skill_model.objects.filter(name__in=labels).values_list('name', 'pk'))
+    advert_skill_model.objects.filter(job_advert_id__in=parsed).delete()
+    advert_skill_model.objects.bulk_create(
+        advert_skill_model(job_advert_id=pk, skill_id=skill_ids[name], position=position)
+        for pk, skills in parsed.items()
+        for position, (name, _) in enumerate(skills)
+    )
+
+
+def backfill_skills(adverts, skill_model, advert_skill_model, batch_size: int = 1000) -> int:
+    '''Index the skills of every advert in the queryset, walking it by primary key batch_size at a time'''
+    total, last_pk = 0, None
+    adverts = adverts.order_by('pk')
+    while True:
+        batch = adverts.filter(pk__gt=last_pk) if last_pk is not None else adverts
+        batch = list(batch.values_list('pk', 'skills')[:batch_size])
+        if not batch:
+            return total
+        index_skills(batch, skill_model, advert_skill_model)
+        total += len(batch)
+        last_pk = batch[-1][0]
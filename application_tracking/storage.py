@@ -0,0 +1,60 @@
+import hashlib
+import os
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every file after the SHA-256 of its contents, so an upload identical to one
+    already stored is never written again. Files are kept as <directory>/<digest[:2]>/<digest><extension>.
+    Deleting a file shared by several records is left to CVBlob reference counting.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # two uploads of the same content race to the same name, overwriting with identical bytes is harmless
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def digest(content: File) -> str:
+        """
+        Hash the file chunk by chunk so large uploads are never read into memory at once. The digest
+        is kept on the file, so naming an upload before it is saved does not read it a second time.
+        """
+        cached = getattr(content, '_sha256_digest', None)
+        if cached is not None:
+            return cached
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            sha256.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        content._sha256_digest = sha256.hexdigest()
+        return content._sha256_digest
+
+    def content_name(self, name: str, content: File) -> str:
+        directory, filename = os.path.split(name)
+        digest = self.digest(content)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], f'{digest}{extension}')
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,45 @@
+import logging
+from celery import shared_task
+from accounts.models import User
+from .feeds import store_feeds
+from .models import JobAdvert, JobApplication, SimilarAdvert
+
+FEED_BATCH_SIZE = 500
+# the rebuild grows linearly, about 40 minutes at 500k active adverts; stop it well before the next night
+SIMILAR_ADVERTS_SOFT_TIME_LIMIT = 2 * 60 * 60
+SIMILAR_ADVERTS_TIME_LIMIT = SIMILAR_ADVERTS_SOFT_TIME_LIMIT + 5 * 60
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(soft_time_limit=SIMILAR_ADVERTS_SOFT_TIME_LIMIT, time_limit=SIMILAR_ADVERTS_TIME_LIMIT)
+def rebuild_similar_adverts(k: int = 10) -> int:
+    '''Recompute the "similar jobs" of active adverts, run nightly by celery beat, then the feeds built on them'''
+    written = SimilarAdvert.objects.rebuild(JobAdvert.objects.active(), k=k)
+    logger.info('Stored %d similar advert pairs', written)
+    refresh_feeds.delay()
+    return written
+
+
+@shared_task
+def refresh_feeds(batch_size: int = FEED_BATCH_SIZE) -> int:
+    '''Rebuild the feed of every user who has applied for something, batch_size users at a time'''
+    emails = (
+        User.objects.filter(email__in=JobApplication.objects.values('email'))
+        .order_by('email')
+        .values_list('email', flat=True)
+    )
+    total, last_email = 0, None
+    while batch := list((emails.filter(email__gt=last_email) if last_email else emails)[:batch_size]):
+        store_feeds(batch)
+        total += len(batch)
+        last_email = batch[-1]
+    logger.info('Refreshed %d feeds', total)
+    return total
+
+
+@shared_task
+def refresh_feed(email: str) -> None:
+    '''Rebuild one user's feed after they apply for something'''
+    if User.objects.filter(email=email).exists():
+        store_feeds([email])
@@ -1,21 +1,30 @@
+import random
+
 import factory
 from faker import Faker
+from application_tracking.enums import EmploymentType, ExperienceLevel, LocationType
 from application_tracking.models import JobAdvert, JobApplication
 
 
 fake = Faker()
 
+SKILLS = ["Python", "Django", "React", "AWS", "Docker", "Go", "SQL", "Excel", "Sales", "Figma", "Kubernetes", "Java"]
+
 
 class JobAdvertFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = JobAdvert
 
 
-    title = fake.job()
-    company_name = fake.company()
-    description = fake.sentence()
-    skills = "Python, Django"
-    deadline = fake.date()
+    title = factory.Faker("job")
+    company_name = factory.Faker("company")
+    employment_type = factory.Faker("random_element", elements=[value for value, _ in EmploymentType])
+    experience_level = factory.Faker("random_element", elements=[value for value, _ in ExperienceLevel])
+    job_type = factory.Faker("random_element", elements=[value for value, _ in LocationType])
+    location = factory.Faker("city")
+    description = factory.Faker("paragraph", nb_sentences=4)
+    skills = factory.LazyFunction(lambda: ", ".join(random.sample(SKILLS, 3)))
+    deadline = factory.Faker("date_object")
 
 
 class JobApplicationFactory(factory.django.DjangoModelFactory):
@@ -23,6 +32,7 @@ class JobApplicationFactory(factory.django.DjangoModelFactory):
         model = JobApplication
 
     
-    name = fake.name()
-    portfolio_url = fake.url()
-    cv = fake.file_path()
\ No newline at end of file
+    name = factory.Faker("name")
+    email = factory.Sequence(lambda n: f"applicant{n}@example.com")
+    portfolio_url = factory.Faker("url")
+    cv = factory.LazyFunction(lambda: f"cv/{fake.file_name(extension='pdf')}")
@@ -0,0 +1,102 @@
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+import application_tracking.urls
+import job_portal.urls
+from application_tracking import async_views
+from application_tracking.feeds import feed_cache_key
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def reload_urlconf():
+    importlib.reload(application_tracking.urls)
+    importlib.reload(job_portal.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_client(settings):
+    settings.ASYNC_VIEWS = True
+    reload_urlconf()
+    yield AsyncClient()
+    settings.ASYNC_VIEWS = False
+    reload_urlconf()
+
+
+def test_async_views_are_routed(async_client):
+    assert application_tracking.urls.read_views is async_views
+
+
+def test_async_list_adverts(async_client, user_instance):
+    JobAdvertFactory.create_batch(12, created_by=user_instance, deadline=timezone.now().date())
+
+    response = async_to_sync(async_client.get)(reverse("home"), {"page": 2})
+
+    assert response.status_code == 200
+    page = response.context["job_adverts"]
+    assert (page.paginator.count, len(page.object_list)) == (12, 2)
+
+    response = async_to_sync(async_client.get)(reverse("home"), {"cursor": ""})
+    assert len(response.context["job_adverts"]) == 10
+
+
+def test_async_search_and_get_advert(async_client, user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, title="Elixir Developer", deadline=timezone.now().date())
+
+    response = async_to_sync(async_client.get)(reverse("search"), {"keyword": "elixir"})
+    assert list(response.context["job_adverts"]) == [advert]
+
+    response = async_to_sync(async_client.get)(reverse("job_advert", kwargs={"advert_id": advert.id}))
+    assert response.status_code == 200
+    assert response.context["job_advert"] == advert
+
+
+def test_async_my_applications(async_client, user_instance, auth_user_password):
+    for _ in range(3):
+        JobApplicationFactory(email=user_instance.email, job_advert=JobAdvertFactory(created_by=user_instance))
+    async_to_sync(async_client.alogin)(email=user_instance.email, password=auth_user_password)
+
+    response = async_to_sync(async_client.get)(reverse("my_applications"))
+
+    assert response.status_code == 200
+    assert len(response.context["my_applications"].object_list) == 3
+
+
+def test_async_list_adverts_filters_by_facet(async_client, user_instance):
+    today = timezone.now().date()
+    remote = JobAdvertFactory(created_by=user_instance, deadline=today, job_type="Remote")
+    JobAdvertFactory(created_by=user_instance, deadline=today, job_type="Onsite")
+
+    response = async_to_sync(async_client.get)(reverse("home"), {"job_type": "Remote"})
+
+    assert list(response.context["job_adverts"]) == [remote]
+    job_type = next(facet for facet in response.context["facets"] if facet["name"] == "job_type")
+    assert {option["value"]: option["count"] for option in job_type["options"]} == {
+        "Onsite": 1, "Remote": 1, "Hybrid": 0,
+    }
+
+
+def test_async_home_serves_the_cached_feed(async_client, user_instance, auth_user_password):
+    advert = JobAdvertFactory(created_by=user_instance, deadline=timezone.now().date())
+    cache.set(feed_cache_key(user_instance.email), [advert.pk])
+    async_to_sync(async_client.alogin)(email=user_instance.email, password=auth_user_password)
+
+    response = async_to_sync(async_client.get)(reverse("home"))
+
+    assert response.context["feed_adverts"] == [advert]
+
+
+def test_async_autocomplete(async_client, user_instance):
+    JobAdvertFactory(created_by=user_instance, deadline=timezone.now().date(), title="Data Engineer")
+
+    response = async_to_sync(async_client.get)(reverse("autocomplete"), {"q": "eng", "kind": "title"})
+
+    assert response.json() == {"suggestions": [{"kind": "title", "label": "Data Engineer"}]}
@@ -0,0 +1,189 @@
+import sys
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking import autocomplete as autocomplete_module
+from application_tracking.autocomplete import Autocomplete, PrefixIndex, get_autocomplete, rebuild_autocomplete
+from application_tracking.cache import bump_listing_version
+from application_tracking.models import JobAdvert
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def adverts(user_instance):
+    today = timezone.now().date()
+    return [
+        JobAdvertFactory(created_by=user_instance, deadline=today, title="Python Developer", company_name="Acme",
+                         skills="Python, Django", location="Lagos"),
+        JobAdvertFactory(created_by=user_instance, deadline=today, title="Senior Python Developer",
+                         company_name="Pyramid Labs", skills="Python, PostgreSQL", location="London"),
+        JobAdvertFactory(created_by=user_instance, deadline=today, title="Product Designer", company_name="Acme",
+                         skills="Figma", location="Lagos", is_published=False),
+    ]
+
+
+def test_lookup_matches_the_start_of_any_word():
+    index = PrefixIndex()
+    for label in ("Python Developer", "Java Developer", "DevOps Engineer", "Developer Advocate"):
+        index.add(label)
+
+    assert index.lookup("dev") == ["Java Developer", "Python Developer", "Developer Advocate", "DevOps Engineer"]
+    assert index.lookup("DEVELOPER a") == ["Developer Advocate"]
+    assert index.lookup("eloper") == []
+    assert index.lookup("  ") == []
+
+
+def test_terms_stay_until_the_last_advert_using_them_goes():
+    index = PrefixIndex()
+    index.add("Lagos")
+    index.add("lagos ")
+
+    index.discard("LAGOS")
+    assert index.lookup("la") == ["Lagos"]
+
+    index.discard("Lagos")
+    assert index.lookup("la") == []
+    assert index.keys == []
+
+
+def test_build_indexes_active_adverts_only(adverts):
+    autocomplete = Autocomplete.build(JobAdvert.objects.active())
+
+    assert autocomplete.suggest("py") == [
+        {"kind": "title", "label": "Python Developer"},
+        {"kind": "company", "label": "Pyramid Labs"},
+        {"kind": "skill", "label": "Python"},
+        {"kind": "title", "label": "Senior Python Developer"},
+    ]
+    assert autocomplete.suggest("l", kinds=["location"]) == [
+        {"kind": "location", "label": "Lagos"}, {"kind": "location", "label": "London"},
+    ]
+    assert autocomplete.suggest("figma") == []
+
+
+def test_suggest_takes_kinds_in_turn():
+    autocomplete = Autocomplete()
+    for number in range(5):
+        autocomplete.add_advert(number, (("title", f"Data Analyst {number}"), ("company", f"Data Co {number}")))
+
+    kinds = [suggestion["kind"] for suggestion in autocomplete.suggest("data", limit=4)]
+
+    assert kinds == ["title", "company", "title", "company"]
+
+
+@pytest.fixture
+def fast_thread_switching():
+    '''Switch threads every few bytecodes so lookups interleave with updates'''
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_lookups_are_safe_while_adverts_change(fast_thread_switching):
+    autocomplete = Autocomplete()
+    for number in range(200):
+        autocomplete.add_advert(number, (("title", f"Data Analyst {number}"),))
+    errors = []
+
+    def churn():
+        for _ in range(300):
+            for number in range(0, 200, 7):
+                autocomplete.remove_advert(number)
+                autocomplete.add_advert(number, (("title", f"Data Analyst {number}"),))
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    while writer.is_alive():
+        try:
+            assert len(autocomplete.suggest("data", limit=5)) == 5
+        except Exception as error:
+            errors.append(error)
+            break
+    writer.join()
+
+    assert errors == []
+
+
+def test_saves_and_deletes_update_the_built_index(adverts, django_capture_on_commit_callbacks):
+    get_autocomplete()
+    advert = adverts[0]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        advert.title = "Rust Developer"
+        advert.save()
+        adverts[2].publish_advert()
+    assert [suggestion["label"] for suggestion in get_autocomplete().suggest("r", kinds=["title"])] == [
+        "Rust Developer",
+    ]
+    assert get_autocomplete().suggest("prod", kinds=["title"]) == [{"kind": "title", "label": "Product Designer"}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        advert.delete()
+        adverts[2].is_published = False
+        adverts[2].save()
+    assert get_autocomplete().suggest("r", kinds=["title"]) == []
+    assert get_autocomplete().suggest("prod") == []
+    # Acme and Lagos went with the last active adverts using them
+    assert get_autocomplete().suggest("acme") == []
+    assert get_autocomplete().suggest("lag") == []
+
+
+def test_other_processes_writes_are_picked_up_in_the_background(adverts, settings, monkeypatch):
+    settings.AUTOCOMPLETE_MAX_AGE = 0
+    refreshes = []
+    monkeypatch.setattr(autocomplete_module, "refresh_in_background", lambda: refreshes.append(True))
+    built = get_autocomplete()
+
+    assert get_autocomplete() is built
+    assert refreshes == []
+
+    # another process saved an advert
+    bump_listing_version()
+    assert get_autocomplete() is built
+    assert get_autocomplete() is built
+    assert refreshes == [True]
+
+    rebuilt = rebuild_autocomplete()
+    assert rebuilt is not built
+    assert get_autocomplete() is rebuilt
+
+
+def test_changes_made_during_a_rebuild_are_replayed(adverts, monkeypatch, django_capture_on_commit_callbacks):
+    get_autocomplete()
+    build = Autocomplete.build
+
+    def build_then_save(queryset, **kwargs):
+        autocomplete = build(queryset, **kwargs)
+        # saved after the rebuild read its adverts, before it was swapped in
+        with django_capture_on_commit_callbacks(execute=True):
+            adverts[0].title = "Rust Developer"
+            adverts[0].save()
+        return autocomplete
+
+    monkeypatch.setattr(Autocomplete, "build", build_then_save)
+    rebuilt = rebuild_autocomplete()
+
+    assert rebuilt.suggest("rust") == [{"kind": "title", "label": "Rust Developer"}]
+
+
+def test_autocomplete_view_returns_json(client, adverts, django_assert_num_queries):
+    url = reverse("autocomplete")
+    client.get(url, {"q": "dev"})
+
+    with django_assert_num_queries(0):
+        response = client.get(url, {"q": "Lon", "kind": ["location", "planet"]})
+
+    assert response.status_code == 200
+    assert response.json() == {"suggestions": [{"kind": "location", "label": "London"}]}
+    assert client.get(url).json() == {"suggestions": []}
+
+
+def test_benchmark_autocomplete_reports_lookup_latency():
+    call_command("benchmark_autocomplete", terms=2000, lookups=200)
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from application_tracking.models import JobAdvert
+
+pytestmark = pytest.mark.django_db
+
+VIEWS = {"list_adverts", "search", "get_advert", "my_jobs", "advert_applications", "applications_by_score", "apply"}
+
+
+def test_benchmark_views_records_a_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+
+    call_command("benchmark_views", scale=[200], requests=3, baseline=baseline)
+
+    results = json.loads(baseline.read_text())["200"]
+    assert set(results) == VIEWS
+    assert all(result["p95_ms"] >= result["p50_ms"] > 0 and result["queries"] > 0 for result in results.values())
+    assert not JobAdvert.objects.exists()
+
+
+def test_benchmark_views_fails_on_regression(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"200": {view: {"p50_ms": 0.001, "p95_ms": 0.001, "queries": 0} for view in VIEWS}}))
+
+    with pytest.raises(CommandError, match="apply: p95"):
+        call_command("benchmark_views", scale=[200], requests=3, baseline=baseline)
+
+    call_command("benchmark_views", scale=[200], requests=3, baseline=baseline, update_baseline=True)
+    assert json.loads(baseline.read_text())["200"]["apply"]["p95_ms"] > 0.001
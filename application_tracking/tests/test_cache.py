@@ -0,0 +1,47 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_anonymous_listing_is_served_from_cache(client, user_instance, django_assert_num_queries):
+    JobAdvertFactory.create_batch(3, created_by=user_instance, deadline=timezone.now().date())
+    url = reverse("home")
+    first = client.get(url)
+
+    with django_assert_num_queries(0):
+        second = client.get(url)
+
+    assert second.status_code == 200
+    assert second.content == first.content
+
+
+def test_advert_writes_invalidate_the_listing(client, user_instance, django_capture_on_commit_callbacks):
+    url = reverse("home")
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        JobAdvertFactory(created_by=user_instance, title="Freshly Posted Role", deadline=timezone.now().date())
+
+    assert b"Freshly Posted Role" in client.get(url).content
+
+
+def test_search_pages_are_cached_per_query(client, user_instance):
+    JobAdvertFactory(created_by=user_instance, title="Golang Developer", deadline=timezone.now().date())
+    client.get(reverse("search"), {"keyword": "golang"})
+
+    response = client.get(reverse("search"), {"keyword": "cobol"})
+
+    assert b"Golang Developer" not in response.content
+
+
+def test_authenticated_users_bypass_the_cache(authenticate_user_client):
+    client, _ = authenticate_user_client
+    client.get(reverse("home"))
+
+    response = client.get(reverse("home"))
+
+    assert response.context is not None
@@ -0,0 +1,102 @@
+import io
+import zipfile
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from accounts.tests.factories import UserFactory
+from application_tracking.enums import ApplicationStatus
+from common.streaming import stream_zip
+from .factories import JobAdvertFactory, JobApplicationFactory, fake
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def make_application(advert, status=ApplicationStatus.APPLIED, content=b"%PDF-1.4 cv"):
+    return JobApplicationFactory(
+        job_advert=advert,
+        email=fake.email(),
+        status=status,
+        cv=SimpleUploadedFile("cv.pdf", content, content_type="application/pdf"),
+    )
+
+
+def read_archive(response) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+
+def test_download_cvs_streams_every_cv(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    applications = [make_application(advert, content=f"cv {i}".encode()) for i in range(3)]
+    make_application(JobAdvertFactory(created_by=user))
+
+    response = client.get(reverse("download_cvs", kwargs={"advert_id": advert.id}))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/zip"
+    archive = read_archive(response)
+    assert archive.testzip() is None
+    assert sorted(archive.read(name) for name in archive.namelist()) == [b"cv 0", b"cv 1", b"cv 2"]
+    assert all(name.startswith("APPLIED/") for name in archive.namelist())
+    assert len(applications) == len(archive.namelist())
+
+
+def test_download_cvs_filters_by_status(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    make_application(advert, ApplicationStatus.APPLIED)
+    hired = make_application(advert, ApplicationStatus.HIRED, content=b"hired cv")
+
+    response = client.get(reverse("download_cvs", kwargs={"advert_id": advert.id}), {"status": "HIRED"})
+
+    archive = read_archive(response)
+    assert [archive.read(name) for name in archive.namelist()] == [b"hired cv"]
+    assert archive.namelist()[0].endswith(f"{hired.id.hex[:8]}.pdf")
+
+
+def test_download_cvs_skips_missing_files(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    make_application(advert, content=b"present")
+    missing = make_application(advert)
+    missing.cv.delete(save=False)
+
+    archive = read_archive(client.get(reverse("download_cvs", kwargs={"advert_id": advert.id})))
+
+    assert [archive.read(name) for name in archive.namelist()] == [b"present"]
+
+
+def test_download_cvs_rejects_unknown_status(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+
+    response = client.get(reverse("download_cvs", kwargs={"advert_id": advert.id}), {"status": "nope"})
+
+    assert response.status_code == 400
+
+
+def test_download_cvs_forbidden_for_other_employers(authenticate_user_client):
+    client, _ = authenticate_user_client
+    advert = JobAdvertFactory(created_by=UserFactory())
+
+    response = client.get(reverse("download_cvs", kwargs={"advert_id": advert.id}))
+
+    assert response.status_code == 403
+
+
+def test_stream_zip_yields_chunks_no_larger_than_the_buffer():
+    content = bytes(range(256)) * 1024
+    pieces = list(stream_zip([("big.bin", ContentFile(content))], chunk_size=8 * 1024))
+
+    assert max(len(piece) for piece in pieces) < 9 * 1024
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.read("big.bin") == content
@@ -0,0 +1,145 @@
+import hashlib
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from application_tracking import storage
+from application_tracking.models import CVBlob, JobApplication
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def advert(user_instance):
+    return JobAdvertFactory(created_by=user_instance)
+
+
+def upload(content: bytes, name: str = "cv.pdf") -> SimpleUploadedFile:
+    return SimpleUploadedFile(name, content, content_type="application/pdf")
+
+
+def stored_files(tmp_path) -> list:
+    return [path for path in (tmp_path / "cv").rglob("*") if path.is_file()]
+
+
+def test_identical_uploads_share_one_file(advert, tmp_path):
+    first = JobApplicationFactory(job_advert=advert, cv=upload(b"same cv", "mine.PDF"))
+    second = JobApplicationFactory(job_advert=JobAdvertFactory(created_by=advert.created_by), cv=upload(b"same cv"))
+    other = JobApplicationFactory(job_advert=advert, cv=upload(b"another cv"))
+
+    digest = hashlib.sha256(b"same cv").hexdigest()
+    assert first.cv.name == second.cv.name == f"cv/{digest[:2]}/{digest}.pdf"
+    assert other.cv.name != first.cv.name
+    assert len(stored_files(tmp_path)) == 2
+    assert CVBlob.objects.get(name=first.cv.name).reference_count == 2
+
+
+def test_an_upload_is_hashed_once(advert, monkeypatch):
+    hashed, original = [], hashlib.sha256
+
+    def sha256():
+        hashed.append(True)
+        return original()
+
+    monkeypatch.setattr(storage.hashlib, "sha256", sha256)
+    application = JobApplicationFactory(job_advert=advert, cv=upload(b"a large cv"))
+
+    assert hashed == [True]
+    assert CVBlob.objects.get(name=application.cv.name).reference_count == 1
+
+
+def test_file_is_deleted_with_its_last_application(advert, tmp_path, django_capture_on_commit_callbacks):
+    first = JobApplicationFactory(job_advert=advert, cv=upload(b"same cv"))
+    second = JobApplicationFactory(job_advert=JobAdvertFactory(created_by=advert.created_by), cv=upload(b"same cv"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert second.cv.storage.exists(second.cv.name)
+    assert CVBlob.objects.get(name=second.cv.name).reference_count == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert stored_files(tmp_path) == []
+    assert not CVBlob.objects.exists()
+
+
+def test_reference_is_counted_before_the_file_is_looked_for(advert, monkeypatch):
+    existing = JobApplicationFactory(job_advert=advert, cv=upload(b"same cv"))
+    storage = existing.cv.storage
+    exists, counts = type(storage).exists, []
+
+    def counting_exists(self, name):
+        counts.append(CVBlob.objects.get(name=name).reference_count)
+        return exists(self, name)
+
+    monkeypatch.setattr(type(storage), "exists", counting_exists)
+    JobApplicationFactory(job_advert=JobAdvertFactory(created_by=advert.created_by), cv=upload(b"same cv"))
+
+    assert counts[0] == 2
+
+
+def test_collect_keeps_a_file_referenced_again_before_it_ran(advert):
+    application = JobApplicationFactory(job_advert=advert, cv=upload(b"same cv"))
+    storage, name = application.cv.storage, application.cv.name
+
+    assert CVBlob.objects.release(name)
+    # a new application takes the file between the release and its on_commit collect
+    CVBlob.objects.acquire(name)
+    CVBlob.objects.collect(storage, name)
+
+    assert storage.exists(name)
+    assert CVBlob.objects.get(name=name).reference_count == 1
+
+
+def test_deleting_an_advert_releases_its_cvs(advert, tmp_path, django_capture_on_commit_callbacks):
+    JobApplicationFactory(job_advert=advert, cv=upload(b"cv one"))
+    JobApplicationFactory(job_advert=advert, cv=upload(b"cv two"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        advert.delete()
+
+    assert stored_files(tmp_path) == []
+
+
+def test_rejected_duplicate_keeps_a_shared_cv(client, advert):
+    existing = JobApplicationFactory(job_advert=advert, email="random@gmail.com", cv=upload(b"same cv"))
+    url = reverse("apply_for_job", kwargs={"advert_id": advert.id})
+
+    client.post(url, {
+        "name": "Random name",
+        "email": "random@gmail.com",
+        "portfolio_url": "https://docs.djangoproject.com/en/",
+        "cv": upload(b"same cv"),
+    })
+
+    assert existing.cv.storage.exists(existing.cv.name)
+    assert JobApplication.objects.filter(job_advert=advert).count() == 1
+
+
+def test_deduplicate_cvs_merges_legacy_files(advert, tmp_path):
+    storage = JobApplication._meta.get_field("cv").storage
+    legacy_names = [
+        super(type(storage), storage).save(f"cv/legacy_{i}.pdf", ContentFile(b"legacy cv")) for i in range(3)
+    ]
+    for name in legacy_names:
+        JobApplication.objects.filter(pk=JobApplicationFactory(job_advert=advert).pk).update(cv=name)
+    CVBlob.objects.all().delete()
+    CVBlob.objects.bulk_create(CVBlob(name=name, reference_count=1) for name in legacy_names)
+
+    call_command("deduplicate_cvs")
+
+    digest = hashlib.sha256(b"legacy cv").hexdigest()
+    assert [path.name for path in stored_files(tmp_path)] == [f"{digest}.pdf"]
+    assert set(JobApplication.objects.filter(job_advert=advert).values_list("cv", flat=True)) == {
+        f"cv/{digest[:2]}/{digest}.pdf"
+    }
+    assert CVBlob.objects.get(name=f"cv/{digest[:2]}/{digest}.pdf").reference_count == 3
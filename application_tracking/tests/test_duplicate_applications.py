@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.test.client import Client
+from django.urls import reverse
+
+from application_tracking.models import JobApplication
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def application_data(email: str) -> dict:
+    return {
+        "name": "Random name",
+        "email": email,
+        "portfolio_url": "https://docs.djangoproject.com/en/",
+        "cv": SimpleUploadedFile("sample.pdf", b"content"),
+    }
+
+
+@pytest.mark.django_db
+def test_duplicate_email_is_rejected_by_the_database(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance)
+    JobApplicationFactory(job_advert=advert, email="Someone@Example.com")
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        JobApplicationFactory(job_advert=advert, email="someone@example.com")
+
+    JobApplicationFactory(job_advert=JobAdvertFactory(created_by=user_instance), email="someone@example.com")
+
+
+@pytest.mark.django_db
+def test_apply_does_not_query_for_duplicates(client, user_instance, django_assert_num_queries):
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse("apply_for_job", kwargs={"advert_id": advert.id})
+
+    # advert lookup, savepoint, savepoint around the CV reference and the insert,
+    # CV reference (update, savepoint, insert, release), insert, release, counter update, release savepoint
+    with django_assert_num_queries(11):
+        response = client.post(url, application_data("random@gmail.com"))
+
+    assert response.status_code == 302
+    assert JobApplication.objects.filter(job_advert=advert).count() == 1
+
+
+@pytest.mark.django_db
+def test_duplicate_apply_leaves_no_orphaned_cv(client, user_instance, tmp_path):
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse("apply_for_job", kwargs={"advert_id": advert.id})
+    client.post(url, application_data("random@gmail.com"))
+
+    client.post(url, application_data("RANDOM@gmail.com"))
+
+    assert len(list((tmp_path / "cv").iterdir())) == 1
+    advert.refresh_from_db()
+    assert advert.applied_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_submissions_create_one_application(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse("apply_for_job", kwargs={"advert_id": advert.id})
+    submissions = 8
+    barrier = threading.Barrier(submissions)
+    outcomes = []
+
+    def submit():
+        try:
+            barrier.wait()
+            for _ in range(50):
+                try:
+                    outcomes.append(Client().post(url, application_data("random@gmail.com")).status_code)
+                    break
+                except OperationalError:
+                    # the shared-cache test database reports lock contention instead of waiting on it
+                    time.sleep(0.02)
+            else:
+                outcomes.append("database stayed locked")
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=submit) for _ in range(submissions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert JobApplication.objects.filter(job_advert=advert).count() == 1
+    assert outcomes == [302] * submissions
+    advert.refresh_from_db()
+    assert advert.applied_count == 1
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse
+
+from accounts.tests.factories import UserFactory
+from .factories import JobAdvertFactory, JobApplicationFactory, fake
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def advert_with_applications(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    applications = [JobApplicationFactory(job_advert=advert, email=fake.email()) for _ in range(5)]
+    JobApplicationFactory(job_advert=JobAdvertFactory(created_by=user), email=fake.email())
+    return client, advert, applications
+
+
+def test_export_applications_as_csv(advert_with_applications):
+    client, advert, applications = advert_with_applications
+    url = reverse("export_applications", kwargs={"advert_id": advert.id})
+
+    response = client.get(url, {"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+    assert sorted(row["email"] for row in rows) == sorted(a.email for a in applications)
+
+
+def test_export_csv_neutralises_formulas(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    JobApplicationFactory(job_advert=advert, name='=HYPERLINK("https://evil.example","cv")', email=fake.email())
+
+    response = client.get(reverse("export_applications", kwargs={"advert_id": advert.id}), {"format": "csv"})
+
+    row = next(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+    assert row["name"] == '\'=HYPERLINK("https://evil.example","cv")'
+
+
+def test_export_applications_as_ndjson(advert_with_applications):
+    client, advert, applications = advert_with_applications
+    url = reverse("export_applications", kwargs={"advert_id": advert.id})
+
+    response = client.get(url, {"format": "ndjson"})
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert sorted(record["id"] for record in records) == sorted(str(a.id) for a in applications)
+    assert {record["status"] for record in records} == {"APPLIED"}
+
+
+def test_export_streams_before_reading_applications(advert_with_applications, django_assert_num_queries):
+    client, advert, _ = advert_with_applications
+    url = reverse("export_applications", kwargs={"advert_id": advert.id})
+    response = client.get(url, {"format": "csv"})
+
+    content = iter(response.streaming_content)
+    with django_assert_num_queries(0):
+        header = next(content)
+    assert header.startswith(b"id,name,email")
+
+    with django_assert_num_queries(1):
+        assert len(list(content)) == 5
+
+
+def test_export_rejects_other_employers_and_formats(authenticate_user_client):
+    client, user = authenticate_user_client
+    foreign = JobAdvertFactory(created_by=UserFactory())
+    own = JobAdvertFactory(created_by=user)
+
+    assert client.get(reverse("export_applications", kwargs={"advert_id": foreign.id})).status_code == 403
+    response = client.get(reverse("export_applications", kwargs={"advert_id": own.id}), {"format": "xml"})
+    assert response.status_code == 400
@@ -0,0 +1,101 @@
+import pytest
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking.facets import cached_facet_counts, filter_query, parse_facets
+from application_tracking.models import JobAdvert
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def adverts(user_instance):
+    today = timezone.now().date()
+    return [
+        JobAdvertFactory(created_by=user_instance, deadline=today, employment_type="Full Time", job_type="Remote",
+                         experience_level="Senior Level", salary=120_000),
+        JobAdvertFactory(created_by=user_instance, deadline=today, employment_type="Full Time", job_type="Hybrid",
+                         experience_level="Mid Level", salary=60_000),
+        JobAdvertFactory(created_by=user_instance, deadline=today, employment_type="Contract", job_type="Remote",
+                         experience_level="Senior Level", salary=250_000),
+        JobAdvertFactory(created_by=user_instance, deadline=today, employment_type="Part Time", job_type="Onsite",
+                         experience_level="Entry Level", salary=None),
+    ]
+
+
+def test_facet_counts_come_from_one_query(adverts, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        counts = JobAdvert.objects.active().facet_counts({})
+
+    assert counts["employment_type"] == {"Full Time": 2, "Contract": 1, "Part Time": 1}
+    assert counts["job_type"] == {"Remote": 2, "Hybrid": 1, "Onsite": 1}
+    assert counts["salary_band"] == {"100k-200k": 1, "50k-100k": 1, "200k-plus": 1, "": 1}
+
+
+def test_facet_counts_ignore_their_own_selection(adverts):
+    counts = JobAdvert.objects.active().facet_counts({"job_type": ["Remote"]})
+
+    # other job types stay visible so the selection can be widened
+    assert counts["job_type"] == {"Remote": 2, "Hybrid": 1, "Onsite": 1}
+    # every other facet only counts remote jobs
+    assert counts["employment_type"] == {"Full Time": 1, "Contract": 1}
+    assert counts["experience_level"] == {"Senior Level": 2}
+
+
+def test_filter_facets_ors_within_a_facet_and_ands_across_facets(adverts):
+    selected = {"job_type": ["Remote", "Hybrid"], "salary_band": ["50k-100k", "200k-plus"]}
+
+    assert set(JobAdvert.objects.filter_facets(selected)) == {adverts[1], adverts[2]}
+
+
+def test_parse_facets_drops_unknown_values():
+    params = QueryDict("job_type=Remote&job_type=Moon&salary_band=1m-plus&keyword=python")
+
+    assert parse_facets(params) == {"job_type": ["Remote"]}
+
+
+def test_filter_query_keeps_filters_but_not_the_page():
+    params = QueryDict("keyword=python&job_type=Remote&page=3&cursor=abc")
+
+    assert filter_query(params) == "keyword=python&job_type=Remote"
+
+
+def test_facet_counts_are_cached_until_an_advert_changes(adverts, django_assert_num_queries,
+                                                         django_capture_on_commit_callbacks):
+    queryset = JobAdvert.objects.active()
+    cached_facet_counts(queryset, "home", {})
+
+    with django_assert_num_queries(0):
+        counts = cached_facet_counts(queryset, "home", {})
+    assert counts["job_type"]["Remote"] == 2
+
+    adverts[1].job_type = "Remote"
+    with django_capture_on_commit_callbacks(execute=True):
+        adverts[1].save()
+    assert cached_facet_counts(queryset, "home", {})["job_type"]["Remote"] == 3
+
+
+def test_list_adverts_filters_by_facet(client, adverts):
+    response = client.get(reverse("home"), {"job_type": "Remote", "salary_band": "200k-plus"})
+
+    assert list(response.context["job_adverts"]) == [adverts[2]]
+    job_type = next(facet for facet in response.context["facets"] if facet["name"] == "job_type")
+    assert {option["value"]: (option["count"], option["selected"]) for option in job_type["options"]} == {
+        "Onsite": (0, False), "Remote": (1, True), "Hybrid": (0, False),
+    }
+    assert response.context["filter_query"] == "job_type=Remote&salary_band=200k-plus"
+
+
+def test_search_counts_only_matching_adverts(client, user_instance, adverts):
+    JobAdvertFactory(created_by=user_instance, deadline=timezone.now().date(), title="Zig Developer",
+                     job_type="Hybrid")
+
+    response = client.get(reverse("search"), {"keyword": "zig", "job_type": "Hybrid"})
+
+    assert [advert.title for advert in response.context["job_adverts"]] == ["Zig Developer"]
+    job_type = next(facet for facet in response.context["facets"] if facet["name"] == "job_type")
+    assert {option["value"]: option["count"] for option in job_type["options"]} == {
+        "Onsite": 0, "Remote": 0, "Hybrid": 1,
+    }
@@ -0,0 +1,96 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking import tasks
+from application_tracking.feeds import build_feeds, feed_cache_key, store_feeds
+from application_tracking.models import SimilarAdvert
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def adverts(user_instance):
+    today = timezone.now().date()
+    return [JobAdvertFactory(created_by=user_instance, deadline=today) for _ in range(6)]
+
+
+def neighbours(advert, *scored):
+    for rank, (neighbour, score) in enumerate(scored):
+        SimilarAdvert.objects.create(advert=advert, neighbour=neighbour, rank=rank, score=score)
+
+
+def test_feed_sums_similarities_to_recent_applications(user_instance, adverts):
+    first, second, a, b, c, d = adverts
+    JobApplicationFactory(job_advert=first, email=user_instance.email)
+    JobApplicationFactory(job_advert=second, email=user_instance.email)
+    neighbours(first, (a, 0.5), (second, 0.9), (c, 0.3))
+    neighbours(second, (b, 0.5), (c, 0.3), (first, 0.9))
+    d.is_published = False
+    d.save()
+    SimilarAdvert.objects.create(advert=second, neighbour=d, rank=3, score=0.99)
+
+    feed = build_feeds([user_instance.email])[user_instance.email]
+
+    # c is close to both, b to the newer application, already applied and inactive adverts are left out
+    assert feed == [c.pk, b.pk, a.pk]
+
+
+def test_feeds_of_many_users_take_two_queries(user_instance, adverts, django_assert_num_queries):
+    emails = [f"user{n}@example.com" for n in range(5)]
+    for email, advert in zip(emails, adverts):
+        JobApplicationFactory(job_advert=advert, email=email)
+    neighbours(adverts[0], (adverts[1], 0.4))
+
+    with django_assert_num_queries(2):
+        feeds = build_feeds(emails)
+
+    assert feeds[emails[0]] == [adverts[1].pk]
+    assert feeds[emails[1]] == []
+
+
+def test_refresh_feed_only_builds_feeds_for_users(user_instance, adverts):
+    JobApplicationFactory(job_advert=adverts[0], email=user_instance.email)
+    JobApplicationFactory(job_advert=adverts[0], email="guest@example.com")
+    neighbours(adverts[0], (adverts[1], 0.4))
+
+    tasks.refresh_feed(user_instance.email)
+    tasks.refresh_feed("guest@example.com")
+
+    assert cache.get(feed_cache_key(user_instance.email)) == [adverts[1].pk]
+    assert cache.get(feed_cache_key("guest@example.com")) is None
+
+
+def test_refresh_feeds_walks_every_applicant(user_instance, adverts, django_user_model):
+    users = [django_user_model.objects.create(email=f"user{n}@example.com") for n in range(3)]
+    for user in users + [user_instance]:
+        JobApplicationFactory(job_advert=adverts[0], email=user.email)
+
+    assert tasks.refresh_feeds(batch_size=2) == 4
+    assert all(cache.get(feed_cache_key(user.email)) == [] for user in users)
+
+
+def test_applying_refreshes_the_applicants_feed(user_instance, adverts, monkeypatch,
+                                                 django_capture_on_commit_callbacks):
+    refreshed = []
+    monkeypatch.setattr(tasks.refresh_feed, "delay", refreshed.append)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        JobApplicationFactory(job_advert=adverts[0], email="someone@example.com")
+
+    assert refreshed == ["someone@example.com"]
+
+
+def test_home_page_serves_the_cached_feed(authenticate_user_client, adverts):
+    client, user = authenticate_user_client
+    JobApplicationFactory(job_advert=adverts[0], email=user.email)
+    neighbours(adverts[0], (adverts[2], 0.9), (adverts[1], 0.5))
+
+    assert client.get(reverse("home")).context["feed_adverts"] == []
+
+    store_feeds([user.email])
+    response = client.get(reverse("home"))
+    assert response.context["feed_adverts"] == [adverts[2], adverts[1]]
+    assert b"Recommended for you" in response.content
@@ -1,3 +1,6 @@
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
 from django.utils import timezone
 import pytest
 from django.contrib.messages import get_messages
@@ -112,12 +115,14 @@ def test_edit_advert(authenticate_user_client):
 
 def test_get_my_applications(authenticate_user_client):
     client, user = authenticate_user_client
-    JobApplicationFactory.create_batch(5, email=user.email, job_advert = JobAdvertFactory(
-        created_by = UserFactory()
-    ))
-    JobApplicationFactory.create_batch(10, email="randomuser@gmail.com", job_advert = JobAdvertFactory(
-        created_by = UserFactory()
-    ))
+    for _ in range(5):
+        JobApplicationFactory(email=user.email, job_advert = JobAdvertFactory(
+            created_by = UserFactory()
+        ))
+    for _ in range(10):
+        JobApplicationFactory(email="randomuser@gmail.com", job_advert = JobAdvertFactory(
+            created_by = UserFactory()
+        ))
     url = reverse("my_applications")
     response = client.get(url)
     assert response.status_code == 200
@@ -224,10 +229,12 @@ def test_decide_application_unauthorised(authenticate_user_client):
 def test_get_applicants_for_an_advert(authenticate_user_client):
     client, user = authenticate_user_client
     advert1 = JobAdvertFactory(created_by=user)
-    JobApplicationFactory.create_batch(5, job_advert=advert1, email="abcabc4@gmail.com")
+    for i in range(5):
+        JobApplicationFactory(job_advert=advert1, email=f"abcabc4+{i}@gmail.com")
 
     advert2 = JobAdvertFactory(created_by=user)
-    JobApplicationFactory.create_batch(2, job_advert=advert2, email="abcabc4@gmail545.com")
+    for i in range(2):
+        JobApplicationFactory(job_advert=advert2, email=f"abcabc4+{i}@gmail545.com")
 
     url = reverse("advert_applications", kwargs={"advert_id":advert2.id})
 
@@ -301,4 +308,155 @@ def test_search(client: Client):
     assert job1 in job_adverts
     assert job2 not in job_adverts
     assert job3 not in job_adverts
-    assert job4 not in job_adverts
\ No newline at end of file
+    assert job4 not in job_adverts
+
+def test_my_jobs_query_count_is_fixed(authenticate_user_client, django_assert_num_queries):
+    client, user = authenticate_user_client
+    for advert in JobAdvertFactory.create_batch(10, created_by=user):
+        JobApplicationFactory.create_batch(2, job_advert=advert)
+    url = reverse("my_jobs")
+
+    with django_assert_num_queries(4):
+        response = client.get(url)
+
+    jobs = response.context["my_jobs"].object_list
+    assert [job.total_applicants for job in jobs] == [2] * 10
+
+
+def test_my_applications_query_count_is_fixed(authenticate_user_client, django_assert_num_queries):
+    client, user = authenticate_user_client
+    for advert in JobAdvertFactory.create_batch(10, created_by=UserFactory()):
+        JobApplicationFactory(job_advert=advert, email=user.email)
+        JobApplicationFactory(job_advert=advert, email=fake.email())
+    url = reverse("my_applications")
+
+    with django_assert_num_queries(4):
+        response = client.get(url)
+
+    applications = response.context["my_applications"].object_list
+    assert [application.advert_total_applicants for application in applications] == [2] * 10
+
+
+def test_total_applicants_on_bare_instance(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance)
+    JobApplicationFactory.create_batch(3, job_advert=advert)
+
+    assert JobAdvert.objects.get(pk=advert.pk).total_applicants == 3
+
+
+def test_status_counters_follow_apply_and_decide(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    for email in ["first@gmail.com", "second@gmail.com"]:
+        client.post(reverse("apply_for_job", kwargs={"advert_id": advert.id}), {
+            "name": "Random name",
+            "email": email,
+            "portfolio_url": "https://docs.djangoproject.com/en/",
+            "cv": SimpleUploadedFile("sample.pdf", b"content"),
+        })
+    advert.refresh_from_db()
+    assert (advert.applied_count, advert.interview_count) == (2, 0)
+
+    application = advert.applications.first()
+    with patch("application_tracking.views.send_email"):
+        client.post(reverse("decide", kwargs={"job_application_id": application.id}), {"status": "INTERVIEW"})
+    advert.refresh_from_db()
+    assert (advert.applied_count, advert.interview_count) == (1, 1)
+
+    response = client.get(reverse("advert_applications", kwargs={"advert_id": advert.id}))
+    assert response.status_code == 200
+    for application in advert.applications.all():
+        application.cv.delete(save=False)
+
+
+def test_decide_counts_from_the_current_status(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user, applied_count=0, interview_count=1)
+    application = JobApplicationFactory(job_advert=advert, status=ApplicationStatus.APPLIED)
+    stale = JobApplication.objects.select_related("job_advert").get(pk=application.pk)
+    # another recruiter moves the application to interview after this request loaded it
+    JobApplication.objects.filter(pk=application.pk).update(status=ApplicationStatus.INTERVIEW)
+
+    with patch("application_tracking.views.get_object_or_404", return_value=stale), \
+            patch("application_tracking.views.send_email"):
+        client.post(reverse("decide", kwargs={"job_application_id": application.id}), {"status": "REJECTED"})
+
+    advert.refresh_from_db()
+    assert (advert.applied_count, advert.interview_count, advert.rejected_count) == (0, 0, 1)
+
+
+def test_recount_status_totals(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance)
+    JobApplicationFactory.create_batch(3, job_advert=advert, status=ApplicationStatus.APPLIED)
+    JobApplicationFactory(job_advert=advert, email=fake.email(), status=ApplicationStatus.HIRED)
+
+    call_command("recount_application_statuses", stdout=StringIO())
+
+    advert.refresh_from_db()
+    assert (advert.applied_count, advert.interview_count, advert.rejected_count, advert.hired_count) == (3, 0, 0, 1)
+
+
+def test_my_jobs_loads_only_the_current_page(authenticate_user_client):
+    client, user = authenticate_user_client
+    today = timezone.now().date()
+    JobAdvertFactory.create_batch(25, created_by=user, deadline=today)
+
+    response = client.get(reverse("my_jobs"), {"page": 3})
+
+    page = response.context["my_jobs"]
+    assert page.paginator.count == 25
+    assert len(page.object_list) == 5
+    assert [job.time_left for job in page.object_list] == ["Today"] * 5
+
+
+def test_bulk_decide_updates_selected_applications(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    selected = [JobApplicationFactory(job_advert=advert, email=fake.email()) for _ in range(5)]
+    untouched = JobApplicationFactory(job_advert=advert, email=fake.email())
+    call_command("recount_application_statuses", stdout=StringIO())
+    url = reverse("bulk_decide", kwargs={"advert_id": advert.id})
+
+    with patch("application_tracking.views.send_email_batch") as send_email_batch:
+        response = client.post(url, {
+            "status": ApplicationStatus.REJECTED,
+            "application_ids": [application.id for application in selected],
+        })
+
+    assert response.status_code == 302
+    assert JobApplication.objects.filter(status=ApplicationStatus.REJECTED).count() == 5
+    untouched.refresh_from_db()
+    assert untouched.status == ApplicationStatus.APPLIED
+
+    send_email_batch.delay.assert_called_once()
+    emails = send_email_batch.delay.call_args.args[0]
+    assert sorted(email["email_to"][0] for email in emails) == sorted(a.email for a in selected)
+
+    advert.refresh_from_db()
+    assert (advert.applied_count, advert.rejected_count) == (1, 5)
+
+
+def test_bulk_decide_query_count_is_fixed(authenticate_user_client, django_assert_num_queries):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user)
+    applications = JobApplicationFactory.create_batch(30, job_advert=advert)
+    url = reverse("bulk_decide", kwargs={"advert_id": advert.id})
+
+    with patch("application_tracking.views.send_email_batch"), django_assert_num_queries(8):
+        client.post(url, {
+            "status": ApplicationStatus.HIRED,
+            "application_ids": [application.id for application in applications],
+        })
+
+
+def test_bulk_decide_unauthorised(authenticate_user_client):
+    client, _ = authenticate_user_client
+    advert = JobAdvertFactory(created_by=UserFactory())
+    application = JobApplicationFactory(job_advert=advert, email=fake.email())
+    url = reverse("bulk_decide", kwargs={"advert_id": advert.id})
+
+    response = client.post(url, {"status": ApplicationStatus.REJECTED, "application_ids": [application.id]})
+
+    assert response.status_code == 403
+    application.refresh_from_db()
+    assert application.status == ApplicationStatus.APPLIED
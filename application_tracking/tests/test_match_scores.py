@@ -0,0 +1,108 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking.models import JobApplication
+from application_tracking.skills import match_scores, skill_vector
+from common.query_plans import assert_uses_indexes
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_match_scores_are_cosine_similarities():
+    required = skill_vector("Python, Django, AWS, Docker")
+
+    scores = match_scores(required, [
+        skill_vector("docker, aws, django, python"),
+        skill_vector("Python, Django"),
+        skill_vector("Python, Django, Excel, Sales"),
+        skill_vector("JavaScript"),
+        skill_vector(""),
+    ])
+
+    assert scores == [1.0, 0.7071, 0.5, 0.0, 0.0]
+    assert match_scores({}, [skill_vector("Python")]) == [0.0]
+
+
+def test_new_applications_are_scored_against_the_advert(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, skills="Python, Django")
+
+    application = JobApplicationFactory(job_advert=advert, skills="python, django")
+
+    application.refresh_from_db()
+    assert application.match_score == 1.0
+
+
+def test_changing_advert_skills_rescores_its_applications(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, skills="Python")
+    go = JobApplicationFactory(job_advert=advert, skills="Go")
+    python = JobApplicationFactory(job_advert=advert, skills="Python")
+
+    advert.skills = "Go"
+    advert.save()
+
+    assert dict(JobApplication.objects.values_list("pk", "match_score")) == {go.pk: 1.0, python.pk: 0.0}
+    assert advert.applications.all().rescore(advert.skills) == 0
+
+
+def test_edits_that_keep_the_skills_leave_the_index_and_scores_alone(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, skills="Python, Django")
+    JobApplicationFactory.create_batch(3, job_advert=advert, skills="Python")
+
+    for change in ({"title": "Senior Python Developer"}, {"skills": " python ,DJANGO"}):
+        for field, value in change.items():
+            setattr(advert, field, value)
+        with CaptureQueriesContext(connection) as queries:
+            advert.save()
+        writes = [
+            query["sql"] for query in queries
+            if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            and ("advertskill" in query["sql"] or "jobapplication" in query["sql"])
+        ]
+        assert writes == []
+
+    advert.skills = "Django, Python"
+    with CaptureQueriesContext(connection) as queries:
+        advert.save()
+    assert advert.skills_list == ["Django", "Python"]
+    assert not [query for query in queries if "jobapplication" in query["sql"]]
+
+
+def test_applicants_can_be_sorted_by_score(authenticate_user_client):
+    client, user = authenticate_user_client
+    advert = JobAdvertFactory(created_by=user, skills="Python, Django, AWS")
+    partial = JobApplicationFactory(job_advert=advert, skills="Python")
+    none = JobApplicationFactory(job_advert=advert, skills="Excel")
+    full = JobApplicationFactory(job_advert=advert, skills="AWS, Django, Python")
+    url = reverse("advert_applications", kwargs={"advert_id": advert.id})
+
+    response = client.get(url, {"sort": "score"})
+    assert list(response.context["applications"]) == [full, partial, none]
+    assert response.context["sort"] == "score"
+
+    response = client.get(url, {"sort": "nonsense"})
+    assert list(response.context["applications"]) == [full, none, partial]
+    assert response.context["sort"] == "newest"
+
+
+def test_score_sort_uses_an_index(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, deadline=timezone.now().date())
+    JobApplicationFactory(job_advert=advert)
+
+    assert_uses_indexes(advert.applications.order_by("-match_score", "-created_at", "-id")[:10])
+
+
+def test_apply_stores_the_applicants_skills(client, user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, skills="SQL, Excel")
+
+    client.post(reverse("apply_for_job", kwargs={"advert_id": advert.id}), {
+        "name": "Ada", "email": "ada@example.com", "portfolio_url": "https://example.com",
+        "skills": "SQL", "cv": SimpleUploadedFile("sample.pdf", b"content"),
+    })
+
+    application = advert.applications.get()
+    assert (application.skills, application.match_score) == ("SQL", 0.7071)
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking.models import JobAdvert
+from application_tracking.pagination import CursorPaginator
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_cursor_pages_walk_forward_and_back(user_instance):
+    JobAdvertFactory.create_batch(25, created_by=user_instance, deadline=timezone.now().date())
+    expected = list(JobAdvert.objects.order_by('-created_at', '-id'))
+    paginator = CursorPaginator(JobAdvert.objects.all(), 10)
+
+    pages = [paginator.get_page(None)]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [advert for page in pages for advert in page] == expected
+    assert not pages[0].has_previous()
+
+    back = paginator.get_page(pages[2].previous_cursor)
+    assert list(back) == list(pages[1])
+    assert back.has_previous() and back.has_next()
+
+
+def test_invalid_cursor_falls_back_to_first_page(user_instance):
+    JobAdvertFactory.create_batch(3, created_by=user_instance)
+    page = CursorPaginator(JobAdvert.objects.all(), 10).get_page("not-a-cursor")
+
+    assert len(page) == 3
+    assert not page.has_next() and not page.has_previous()
+
+
+def test_list_adverts_cursor_mode_skips_count(client, user_instance):
+    JobAdvertFactory.create_batch(15, created_by=user_instance, deadline=timezone.now().date())
+    first = client.get(reverse("home"), {"cursor": ""}).context["job_adverts"]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("home"), {"cursor": first.next_cursor})
+
+    assert response.status_code == 200
+    assert len(response.context["job_adverts"]) == 5
+    assert not any("COUNT(" in query["sql"] for query in queries.captured_queries)
+
+
+def test_search_cursor_mode(client, user_instance):
+    JobAdvertFactory.create_batch(12, created_by=user_instance, location="Lagos", deadline=timezone.now().date())
+    first = client.get(reverse("search"), {"location": "lagos", "cursor": ""}).context["job_adverts"]
+    second = client.get(reverse("search"), {"location": "lagos", "cursor": first.next_cursor}).context["job_adverts"]
+
+    assert (len(first), len(second)) == (10, 2)
+    assert not second.has_next()
+
+
+def test_keyword_search_keeps_numbered_pages_in_relevance_order(client, user_instance):
+    today = timezone.now().date()
+    # the oldest advert, last in newest-first order, but the best match
+    best = JobAdvertFactory(created_by=user_instance, title="Engineer", skills="Engineer", deadline=today)
+    JobAdvertFactory.create_batch(11, created_by=user_instance, title="Data Analyst", deadline=today,
+                                  description="Reporting and dashboards with some engineer support.")
+
+    response = client.get(reverse("search"), {"keyword": "engineer", "cursor": ""})
+
+    page = response.context["job_adverts"]
+    assert page.paginator.count == 12
+    assert page[0] == best
+    assert response.context["keyset_pages"] is False
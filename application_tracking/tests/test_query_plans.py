@@ -0,0 +1,44 @@
+import pytest
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from application_tracking.models import JobAdvert, JobApplication
+from common.query_plans import assert_uses_indexes, full_table_scans
+from .factories import JobAdvertFactory, JobApplicationFactory, fake
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def advert(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, deadline=timezone.now().date())
+    for _ in range(3):
+        JobApplicationFactory(job_advert=advert, email=fake.unique.email())
+    return advert
+
+
+def test_active_adverts_use_an_index(advert):
+    assert_uses_indexes(JobAdvert.objects.active())
+    assert_uses_indexes(JobAdvert.objects.active().order_by('-created_at', '-id')[:10])
+
+
+def test_my_applications_lookup_uses_an_index(advert):
+    assert_uses_indexes(JobApplication.objects.filter(email="someone@example.com").with_advert_totals())
+
+
+def test_duplicate_application_constraint_is_an_index(advert):
+    applications = advert.applications.alias(email_lower=Lower("email")).filter(email_lower="someone@example.com")
+    assert_uses_indexes(applications)
+
+
+def test_unindexed_filter_is_reported(advert):
+    assert full_table_scans(JobApplication.objects.filter(portfolio_url="https://example.com")) == [
+        "application_tracking_jobapplication"
+    ]
+
+
+def test_skill_filter_uses_indexes(advert):
+    assert full_table_scans(JobAdvert.objects.filter(skills__icontains="python")) == [
+        "application_tracking_jobadvert"
+    ]
+    assert_uses_indexes(JobAdvert.objects.active().with_skills(["Python"]))
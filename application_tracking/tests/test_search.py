@@ -0,0 +1,57 @@
+import pytest
+from django.utils import timezone
+
+from application_tracking.models import JobAdvert
+from application_tracking.search import SQLiteFTS5Backend, get_search_backend, LikeSearchBackend
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_search_index_follows_save_and_delete(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, title="Rust Engineer", deadline=timezone.now().date())
+    assert advert in JobAdvert.objects.search("rust", None)
+
+    advert.title = "Haskell Engineer"
+    advert.save()
+    assert advert not in JobAdvert.objects.search("rust", None)
+    assert advert in JobAdvert.objects.search("haskell", None)
+
+    advert.delete()
+    assert not JobAdvert.objects.search("haskell", None).exists()
+
+
+def test_search_ranks_by_relevance(user_instance):
+    today = timezone.now().date()
+    weak = JobAdvertFactory(created_by=user_instance, title="Accountant", description="Some kotlin exposure is a plus",
+                            deadline=today)
+    strong = JobAdvertFactory(created_by=user_instance, title="Kotlin Developer", skills="Kotlin, Android",
+                              description="Build kotlin services", deadline=today)
+
+    assert list(JobAdvert.objects.search("kotlin", None)) == [strong, weak]
+
+
+def test_search_matches_prefixes_and_ignores_query_syntax(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, title="Platform Engineer", deadline=timezone.now().date())
+
+    assert advert in JobAdvert.objects.search("platf", None)
+    assert advert in JobAdvert.objects.search('"platform" (', None)
+    assert SQLiteFTS5Backend.build_match_query('c++ "dev"') == '"c"* "dev"*'
+
+
+def test_search_backend_is_configurable(settings):
+    settings.JOB_SEARCH_BACKEND = "application_tracking.search.LikeSearchBackend"
+    assert isinstance(get_search_backend(), LikeSearchBackend)
+
+
+def test_rebuild_reindexes_every_advert(user_instance):
+    today = timezone.now().date()
+    adverts = JobAdvert.objects.bulk_create(
+        JobAdvertFactory.build(created_by=user_instance, title=f"Elixir Developer {n}", deadline=today)
+        for n in range(5)
+    )
+    backend = SQLiteFTS5Backend()
+    assert not backend.filter(JobAdvert.objects.all(), "elixir").exists()
+
+    assert backend.rebuild(JobAdvert.objects.all()) == 5
+    assert set(backend.filter(JobAdvert.objects.all(), "elixir")) == set(adverts)
@@ -0,0 +1,116 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking.models import JobAdvert, SimilarAdvert
+from application_tracking.similarity import TfidfIndex, advert_terms
+from common.query_plans import assert_uses_indexes
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def adverts(user_instance):
+    today = timezone.now().date()
+
+    def advert(title, description, skills, **kwargs):
+        return JobAdvertFactory(created_by=user_instance, deadline=today, title=title, description=description,
+                                skills=skills, **kwargs)
+
+    return {
+        "django": advert("Django Developer", "Build web APIs with Django and Postgres", "Python, Django"),
+        "backend": advert("Backend Python Developer", "Build web APIs in Python", "Python, Django, Postgres"),
+        "data": advert("Data Engineer", "Python pipelines feeding the warehouse", "Python, SQL, Airflow"),
+        "nurse": advert("Night Nurse", "Care for patients on the ward", "Patient care"),
+        "midwife": advert("Midwife", "Care for mothers and patients on the maternity ward", "Patient care"),
+    }
+
+
+def test_advert_terms_weight_titles_and_whole_skills():
+    terms = advert_terms("Data Engineer", "We build data pipelines for you", "Machine Learning, SQL")
+
+    assert terms["data"] == 4
+    assert terms["engineer"] == 3
+    assert terms["skill:machine learning"] == 2
+    assert "you" not in terms
+
+
+def test_neighbours_are_ranked_by_cosine_similarity(adverts):
+    index = TfidfIndex.build(JobAdvert.objects.all(), min_df=1, max_df=1.0)
+    position = {pk: n for n, pk in enumerate(index.ids)}
+
+    neighbours = index.neighbours(position[adverts["django"].pk], k=2)
+
+    assert [index.ids[other] for other, _ in neighbours] == [adverts["backend"].pk, adverts["data"].pk]
+    assert 0 < neighbours[1][1] < neighbours[0][1] <= 1
+    assert [index.ids[other] for other, _ in index.neighbours(position[adverts["nurse"].pk], k=5)] == [
+        adverts["midwife"].pk
+    ]
+
+
+def test_max_terms_bounds_every_vector(adverts):
+    index = TfidfIndex.build(JobAdvert.objects.all(), max_terms=3, min_df=1, max_df=1.0)
+
+    assert len(index.terms) <= 3 * len(index)
+    assert all(index.offsets[n + 1] - index.offsets[n] <= 3 for n in range(len(index)))
+
+
+def test_posting_lists_keep_their_heaviest_entries(adverts):
+    index = TfidfIndex.build(JobAdvert.objects.all(), min_df=1, max_df=1.0, max_postings=1)
+
+    for term_id, end in enumerate(index.posting_ends):
+        start = index.posting_starts[term_id]
+        weights = [weight for term, weight in zip(index.terms, index.weights) if term == term_id]
+        assert end - start == 1
+        assert index.posting_weights[start] == max(weights)
+
+
+def test_rebuild_replaces_the_neighbour_table(adverts):
+    stale = JobAdvertFactory(created_by=adverts["nurse"].created_by, deadline=timezone.now().date(), is_published=False)
+    SimilarAdvert.objects.create(advert=stale, neighbour=adverts["nurse"], rank=0, score=1)
+
+    written = SimilarAdvert.objects.rebuild(JobAdvert.objects.active(), k=2, block_size=2, min_df=1, max_df=1.0)
+
+    assert written == SimilarAdvert.objects.count()
+    assert not SimilarAdvert.objects.filter(advert=stale).exists()
+    assert list(JobAdvert.objects.similar_to(adverts["django"])) == [adverts["backend"], adverts["data"]]
+
+    adverts["backend"].is_published = False
+    adverts["backend"].save()
+    assert list(JobAdvert.objects.active().similar_to(adverts["django"])) == [adverts["data"]]
+
+
+def test_rebuild_with_the_nightly_defaults(adverts):
+    SimilarAdvert.objects.rebuild(JobAdvert.objects.active())
+
+    assert list(JobAdvert.objects.similar_to(adverts["django"])) == [adverts["backend"], adverts["data"]]
+    assert list(JobAdvert.objects.similar_to(adverts["nurse"])) == [adverts["midwife"]]
+
+
+def test_adverts_sharing_only_common_terms_still_get_neighbours(user_instance):
+    today = timezone.now().date()
+    titles = ["Python Developer", "Data Engineer", "Product Designer"]
+    skills = ["Python", "SQL", "Figma", "Django"]
+    for number in range(60):
+        JobAdvertFactory(created_by=user_instance, deadline=today, title=titles[number % 3],
+                         description="Join our team", skills=f"{skills[number % 4]}, {skills[(number + 1) % 4]}")
+
+    SimilarAdvert.objects.rebuild(JobAdvert.objects.active(), k=3)
+
+    assert SimilarAdvert.objects.values("advert").distinct().count() == 60
+
+
+def test_similar_adverts_are_read_through_an_index(adverts):
+    SimilarAdvert.objects.rebuild(JobAdvert.objects.active(), min_df=1, max_df=1.0)
+
+    assert_uses_indexes(JobAdvert.objects.active().similar_to(adverts["django"])[:4])
+
+
+def test_advert_page_shows_similar_adverts(client, adverts):
+    SimilarAdvert.objects.rebuild(JobAdvert.objects.active(), min_df=1, max_df=1.0)
+
+    response = client.get(reverse("job_advert", kwargs={"advert_id": adverts["nurse"].id}))
+
+    assert response.context["similar_adverts"] == [adverts["midwife"]]
+    assert b"Similar Jobs" in response.content
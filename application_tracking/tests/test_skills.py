@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from application_tracking.models import AdvertSkill, JobAdvert, Skill
+from application_tracking.skills import parse_skills
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_parse_skills_case_folds_and_drops_duplicates():
+    assert parse_skills(" Python,  machine   learning ,PYTHON,, JavaScript ") == [
+        ("python", "Python"), ("machine learning", "machine learning"), ("javascript", "JavaScript"),
+    ]
+    assert parse_skills(None) == []
+
+
+def test_saving_an_advert_indexes_its_skills(user_instance):
+    first = JobAdvertFactory(created_by=user_instance, skills="Python, Django")
+    second = JobAdvertFactory(created_by=user_instance, skills="python, Go")
+
+    assert first.skills_list == ["Python", "Django"]
+    assert second.skills_list == ["Python", "Go"]
+    assert Skill.objects.count() == 3
+
+    first.skills = "Rust"
+    first.save()
+    assert JobAdvert.objects.prefetch_skills().get(pk=first.pk).skills_list == ["Rust"]
+
+
+def test_partial_saves_leave_skills_alone(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, skills="Python", is_published=False)
+
+    with CaptureQueriesContext(connection) as queries:
+        advert.publish_advert()
+    assert not [query for query in queries if "advertskill" in query["sql"]]
+
+
+def test_skill_filter_matches_whole_skills_only(user_instance):
+    today = timezone.now().date()
+    java = JobAdvertFactory(created_by=user_instance, deadline=today, skills="Java, Spring")
+    javascript = JobAdvertFactory(created_by=user_instance, deadline=today, skills="JavaScript, React")
+    both = JobAdvertFactory(created_by=user_instance, deadline=today, skills="java, javascript")
+
+    assert set(JobAdvert.objects.with_skills(["JAVA"])) == {java, both}
+    assert set(JobAdvert.objects.with_skills(["java", "javascript"])) == {both}
+    assert set(JobAdvert.objects.with_skills([])) == {java, javascript, both}
+
+
+def test_rebuild_skills_indexes_bulk_created_adverts_in_batches(user_instance):
+    adverts = JobAdvert.objects.bulk_create(
+        JobAdvertFactory.build(created_by=user_instance, skills=f"Python, Skill {n % 2}") for n in range(5)
+    )
+    assert not AdvertSkill.objects.exists()
+
+    assert JobAdvert.objects.all().rebuild_skills(batch_size=2) == 5
+    assert AdvertSkill.objects.count() == 10
+    assert set(Skill.objects.values_list("name", flat=True)) == {"python", "skill 0", "skill 1"}
+    assert set(JobAdvert.objects.with_skills(["skill 1"])) == set(adverts[1::2])
+
+
+def test_listing_prefetches_skills(client, user_instance, django_assert_num_queries):
+    JobAdvertFactory.create_batch(3, created_by=user_instance, deadline=timezone.now().date())
+    client.get(reverse("home"))
+    JobAdvertFactory.create_batch(3, created_by=user_instance, deadline=timezone.now().date())
+
+    # session-less anonymous request: version key, facet counts, page count, page, skills
+    with django_assert_num_queries(4):
+        response = client.get(reverse("home"), {"page": 1, "job_type": "Remote"})
+    assert response.status_code == 200
+
+
+def test_search_filters_by_skill(client, user_instance):
+    today = timezone.now().date()
+    JobAdvertFactory(created_by=user_instance, deadline=today, skills="JavaScript")
+    java = JobAdvertFactory(created_by=user_instance, deadline=today, skills="Java")
+
+    response = client.get(reverse("search"), {"skill": "java"})
+
+    assert list(response.context["job_adverts"]) == [java]
+    assert b'?skill=Java"' in response.content
+
+
+def test_advert_page_lists_skills_in_order(client, user_instance):
+    advert = JobAdvertFactory(created_by=user_instance, skills="Go, Kubernetes, AWS")
+
+    response = client.get(reverse("job_advert", kwargs={"advert_id": advert.id}))
+
+    assert response.context["job_advert"].skills_list == ["Go", "Kubernetes", "AWS"]
@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('search/', views.search, name='search'),
+    path('search/', read_views.search, name='search'),
+    path('autocomplete/', read_views.autocomplete, name='autocomplete'),
     path('create/', views.create_advert, name='create_advert'),
-    path('my-applications/', views.my_applications, name='my_applications'),
+    path('my-applications/', read_views.my_applications, name='my_applications'),
     path('my-jobs/', views.my_jobs, name='my_jobs'),
-    path('<uuid:advert_id>/', views.get_advert, name='job_advert'),
+    path('<uuid:advert_id>/', read_views.get_advert, name='job_advert'),
     path('<uuid:advert_id>/apply/', views.apply, name='apply_for_job'),
     path('<uuid:advert_id>/applications/', views.advert_applications, name='advert_applications'),
+    path('<uuid:advert_id>/applications/decide/', views.bulk_decide, name='bulk_decide'),
+    path('<uuid:advert_id>/applications/export/', views.export_applications, name='export_applications'),
+    path('<uuid:advert_id>/applications/cvs/', views.download_cvs, name='download_cvs'),
     path('<uuid:job_application_id>/decide/', views.decide, name='decide'),
     path('<uuid:advert_id>/update/', views.update_advert, name='update_advert'),
     path('<uuid:advert_id>/delete/', views.delete_advert, name='delete_advert'),
@@ -1,17 +1,31 @@
+import csv
+import itertools
+import json
+import os
+import uuid
 from datetime import timedelta
 from django.shortcuts import render, redirect
 from application_tracking.enums import ApplicationStatus
-from common.tasks import send_email
+from common.tasks import send_email, send_email_batch
+from common.streaming import stream_zip
 from accounts.models import User
 from .forms import JobAdvertForm, JobApplicationForm
-from django.http import HttpRequest, HttpResponseForbidden
+from django.http import HttpRequest, HttpResponseForbidden, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
-from .models import JobAdvert, JobApplication
+from .models import CVBlob, JobAdvert, JobApplication
+from .pagination import CursorPaginator
+from .cache import cache_anonymous_listing
+from .facets import cached_facet_counts, facet_groups, filter_query, parse_facets
+from .feeds import feed_adverts
+from .autocomplete import KINDS, MAX_PREFIX_LENGTH, fold_term, get_autocomplete
+from .skills import normalize_skill
 from django.contrib import messages
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.text import get_valid_filename
 from django.core.paginator import Paginator
 from django.db.models import Q
+from django.db import IntegrityError, transaction
 
 
 
@@ -35,26 +49,47 @@ def create_advert(request: HttpRequest):
     
     return render(request, 'create_advert.html', context)
 
+def paginate_adverts(request: HttpRequest, adverts, per_page: int = 10, keyset: bool = True):
+    '''
+    Numbered pages by default, keyset pages once the client asks for a cursor. Cursors follow
+    the newest-first order only, so lists in any other order (keyword relevance) pass keyset=False.
+    '''
+    if keyset and 'cursor' in request.GET:
+        return CursorPaginator(adverts, per_page).get_page(request.GET.get('cursor'))
+    paginator = Paginator(adverts, per_page)
+    return paginator.get_page(request.GET.get('page'))
+
+def search_scope(keyword: str | None, location: str | None, skills: list[str] = ()) -> str:
+    '''What the facet counts of a search depend on besides the selected facets'''
+    skills = ','.join(sorted({normalize_skill(skill) for skill in skills}))
+    return f"search:{(keyword or '').strip().lower()}:{(location or '').strip().lower()}:{skills}"
+
+@cache_anonymous_listing
 def list_adverts(request: HttpRequest):
     active_jobs = JobAdvert.objects.active()
-    
-    paginator = Paginator(active_jobs, 10)
-    request_page = request.GET.get('page')
-    paginated_adverts = paginator.get_page(request_page)
+    selected = parse_facets(request.GET)
+    facet_counts = cached_facet_counts(active_jobs, 'home', selected)
+    paginated_adverts = paginate_adverts(request, active_jobs.filter_facets(selected).prefetch_skills())
     
     context = {
-        'job_adverts': paginated_adverts
+        'job_adverts': paginated_adverts,
+        'facets': facet_groups(facet_counts, selected),
+        'filter_query': filter_query(request.GET),
+        'keyset_pages': True,
+        'feed_adverts': feed_adverts(request.user.email) if request.user.is_authenticated else [],
     }
     
     return render(request, 'home.html', context)
     
+SIMILAR_ADVERTS_SHOWN = 4
+
 def get_advert(request: HttpRequest, advert_id):
     form = JobApplicationForm()
-    job_advert = get_object_or_404(JobAdvert, id=advert_id)
-    job_advert.skills_list = job_advert.skills.split(',') if job_advert.skills else []
+    job_advert = get_object_or_404(JobAdvert.objects.prefetch_skills(), id=advert_id)
     context = {
         'job_advert': job_advert,
-        'application_form': form
+        'application_form': form,
+        'similar_adverts': list(JobAdvert.objects.active().similar_to(job_advert)[:SIMILAR_ADVERTS_SHOWN]),
     }
     return render(request, 'advert.html', context)
     
@@ -92,13 +127,17 @@ def apply(request: HttpRequest, advert_id: int):
     if request.method == 'POST':
         form = JobApplicationForm(request.POST, request.FILES)
         if form.is_valid():
-            email = form.cleaned_data['email']
-            if advert.applications.filter(email__iexact=email).exists():
-                messages.error(request, 'You have already applied for this job')
-                return redirect('job_advert', advert_id=advert_id)
             application: JobApplication = form.save(commit=False)
             application.job_advert = advert
-            application.save()
+            try:
+                with transaction.atomic():
+                    application.save()
+                    advert.record_status_change(None, application.status)
+            except IntegrityError:
+                # unique_application_per_email rejected a duplicate, drop the CV it stored unless it is shared
+                CVBlob.objects.collect(application.cv.storage, application.cv.name)
+                messages.error(request, 'You have already applied for this job')
+                return redirect('job_advert', advert_id=advert_id)
             messages.success(request, 'Application submitted successfully')
             return redirect('job_advert', advert_id=advert_id)
     else:
@@ -115,7 +154,7 @@ def apply(request: HttpRequest, advert_id: int):
 def my_applications(request: HttpRequest):
     user: User = request.user
     
-    applications = JobApplication.objects.filter(email = user.email)
+    applications = JobApplication.objects.filter(email = user.email).with_advert_totals()
     paginator = Paginator(applications, 10)
     request_page = request.GET.get('page')
     paginated_applications = paginator.get_page(request_page)
@@ -129,24 +168,7 @@ def my_applications(request: HttpRequest):
 @login_required
 def my_jobs(request: HttpRequest):
     user: User = request.user
-    today = timezone.now().date()
-    jobs = JobAdvert.objects.filter(created_by = user)
-    
-    for job in jobs:
-        if job.deadline:
-            delta = job.deadline - today
-            if delta.days > 30:
-                job.time_left = f"{delta.days // 30} months left"
-            elif delta.days > 0:
-                job.time_left = f"{delta.days} days left"
-            elif delta.days == 0:
-                job.time_left = "Today"
-            else:
-                job.time_left = "Expired"
-        else:
-            job.time_left = "No deadline"
-
-        
+    jobs = JobAdvert.objects.filter(created_by = user).with_total_applicants()
     
     paginator = Paginator(jobs, 10)
     request_page = request.GET.get('page')
@@ -159,74 +181,216 @@ def my_jobs(request: HttpRequest):
     
     return render(request, 'my_jobs.html', context)
 
+# ?sort= value -> ordering; application_advert_score_idx returns the best matches without sorting
+APPLICATION_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'score': ('-match_score', '-created_at', '-id'),
+}
+
 @login_required
 def advert_applications(request: HttpRequest, advert_id: int):
     advert: JobAdvert = get_object_or_404(JobAdvert, pk=advert_id)
     if request.user != advert.created_by:
         return HttpResponseForbidden("You do not have permission to view this page.")
     
-    applications = advert.applications.all()
-    # applications = JobApplication.objects.filter(job_advert = advert.id)
+    sort = request.GET.get('sort')
+    if sort not in APPLICATION_SORTS:
+        sort = 'newest'
+    applications = advert.applications.order_by(*APPLICATION_SORTS[sort])
     paginator = Paginator(applications, 10)
     request_page = request.GET.get('page')
     paginated_applications = paginator.get_page(request_page)
     
     context = {
         'job_advert': advert,
-        'applications': paginated_applications
+        'applications': paginated_applications,
+        'sort': sort,
     }
     
     return render(request, 'advert_applications.html', context)
 
+class Echo:
+    '''File-like object whose write returns the value, so csv.writer can feed a generator'''
+
+    def write(self, value):
+        return value
+
+EXPORT_FIELDS = ['id', 'name', 'email', 'portfolio_url', 'cv', 'status', 'created_at']
+# leading characters that make Excel and Sheets evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def csv_safe(value):
+    '''Quote applicant-typed text that a spreadsheet would otherwise run as a formula'''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+@login_required
+def export_applications(request: HttpRequest, advert_id: int):
+    advert: JobAdvert = get_object_or_404(JobAdvert, pk=advert_id)
+    if request.user.pk != advert.created_by_id:
+        return HttpResponseForbidden("You do not have permission to view this page.")
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return HttpResponseBadRequest("Unsupported export format.")
+
+    rows = advert.applications.order_by().values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        content = itertools.chain([writer.writerow(EXPORT_FIELDS)], (writer.writerow(map(csv_safe, row)) for row in rows))
+        content_type = 'text/csv'
+    else:
+        content = (json.dumps(dict(zip(EXPORT_FIELDS, row)), default=str) + '\n' for row in rows)
+        content_type = 'application/x-ndjson'
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="applications-{advert.id}.{export_format}"'
+    return response
+
+def cv_archive_entries(applications):
+    '''(archive name, file) pairs for every application whose CV is still in storage'''
+    for application in applications:
+        if not application.cv or not application.cv.storage.exists(application.cv.name):
+            continue
+        extension = os.path.splitext(application.cv.name)[1]
+        arcname = get_valid_filename(f'{application.name}-{application.id.hex[:8]}{extension}')
+        yield f'{application.status}/{arcname}', application.cv
+
+@login_required
+def download_cvs(request: HttpRequest, advert_id: int):
+    advert: JobAdvert = get_object_or_404(JobAdvert, pk=advert_id)
+    if request.user.pk != advert.created_by_id:
+        return HttpResponseForbidden("You do not have permission to view this page.")
+
+    applications = advert.applications.order_by().only('id', 'name', 'cv', 'status', 'job_advert')
+    status = request.GET.get('status')
+    if status:
+        if status not in ApplicationStatus.values:
+            return HttpResponseBadRequest("Invalid application status.")
+        applications = applications.filter(status=status)
+
+    entries = cv_archive_entries(applications.iterator(chunk_size=500))
+    response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="cvs-{advert.id}.zip"'
+    return response
+
+def decision_email(application: JobApplication, advert: JobAdvert, status: str) -> dict | None:
+    '''Keyword arguments for send_email telling an applicant about a decision, if the status warrants one'''
+    context = {
+        'applicant_name': application.name,
+        'job_title': advert.title,
+        'company_name': advert.company_name,
+    }
+    if status == ApplicationStatus.REJECTED:
+        return {
+            'subject': f'Application Outcome for {advert.title}',
+            'email_to': [application.email],
+            'html_template': 'emails/job_application_update.html',
+            'context': context,
+        }
+    if status == ApplicationStatus.INTERVIEW:
+        return {
+            'subject': f'Interview Invitation for {advert.title}',
+            'email_to': [application.email],
+            'html_template': 'emails/job_application_interview.html',
+            'context': context,
+        }
+    return None
+
 @login_required
 def decide(request: HttpRequest, job_application_id: int):
-    job_application = get_object_or_404(JobApplication, pk=job_application_id)
-    if request.user != job_application.job_advert.created_by:
+    job_application = get_object_or_404(JobApplication.objects.select_related('job_advert'), pk=job_application_id)
+    advert: JobAdvert = job_application.job_advert
+    if request.user.pk != advert.created_by_id:
         return HttpResponseForbidden("You do not have permission to view this page.")
     if request.method == 'POST':
         status = request.POST.get('status')
-        job_application.status = status
-        job_application.save(update_fields=['status'])
+        if status not in ApplicationStatus.values:
+            return HttpResponseBadRequest("Invalid application status.")
+        with transaction.atomic():
+            # re-read under a row lock, a concurrent decision may have moved it since it was loaded
+            previous_status = JobApplication.objects.select_for_update().values_list('status', flat=True).get(
+                pk=job_application.pk
+            )
+            job_application.status = status
+            job_application.save(update_fields=['status'])
+            advert.record_status_change(previous_status, status)
         messages.success(request, 'Application updated successfully.')
         
-        if status == ApplicationStatus.REJECTED:
-            context = {
-                'applicant_name': job_application.name,
-                'job_title': job_application.job_advert.title,
-                'company_name': job_application.job_advert.company_name
-            }
-            send_email.delay(
-                f'Application Outcome for {job_application.job_advert.title}',
-                [job_application.email],
-                'emails/job_application_update.html',
-                context
-            )
-        elif status == ApplicationStatus.INTERVIEW:
-            context = {
-                'applicant_name': job_application.name,
-                'job_title': job_application.job_advert.title,
-                'company_name': job_application.job_advert.company_name,
-            }
-            send_email.delay(
-                f'Interview Invitation for {job_application.job_advert.title}',
-                [job_application.email],
-                'emails/job_application_interview.html',
-                context
-            )
+        email = decision_email(job_application, advert, status)
+        if email:
+            send_email.delay(**email)
             
-        return redirect('advert_applications', advert_id=job_application.job_advert.id)
+        return redirect('advert_applications', advert_id=advert.id)
+
+@login_required
+def bulk_decide(request: HttpRequest, advert_id: int):
+    advert: JobAdvert = get_object_or_404(JobAdvert, pk=advert_id)
+    if request.user.pk != advert.created_by_id:
+        return HttpResponseForbidden("You do not have permission to view this page.")
+    if request.method != 'POST':
+        return redirect('advert_applications', advert_id=advert.id)
+
+    status = request.POST.get('status')
+    if status not in ApplicationStatus.values:
+        return HttpResponseBadRequest("Invalid application status.")
+    try:
+        application_ids = [uuid.UUID(value) for value in request.POST.getlist('application_ids')]
+    except ValueError:
+        return HttpResponseBadRequest("Invalid application id.")
+
+    with transaction.atomic():
+        applications = list(
+            advert.applications.select_for_update()
+            .filter(pk__in=application_ids)
+            .exclude(status=status)
+            .only('id', 'name', 'email', 'status', 'job_advert')
+        )
+        JobApplication.objects.filter(pk__in=[application.pk for application in applications]).update(
+            status=status, updated_at=timezone.now()
+        )
+        advert.record_status_changes([application.status for application in applications], status)
+
+    emails = [decision_email(application, advert, status) for application in applications]
+    emails = [email for email in emails if email]
+    if emails:
+        send_email_batch.delay(emails)
+
+    messages.success(request, f'{len(applications)} applications updated successfully.')
+    return redirect('advert_applications', advert_id=advert.id)
     
+@cache_anonymous_listing
 def search(request: HttpRequest):
     keyword = request.GET.get('keyword')
     location = request.GET.get('location')
-    result = JobAdvert.objects.search(keyword, location)
-    
-    paginator = Paginator(result, 10)
-    request_page = request.GET.get('page')
-    paginated_adverts = paginator.get_page(request_page)
+    skills = request.GET.getlist('skill')
+    result = JobAdvert.objects.search(keyword, location, skills)
+    selected = parse_facets(request.GET)
+    facet_counts = cached_facet_counts(result, search_scope(keyword, location, skills), selected)
+    # keyword results are ranked by relevance, which cursors cannot seek through
+    keyset = not keyword
+    paginated_adverts = paginate_adverts(request, result.filter_facets(selected).prefetch_skills(), keyset=keyset)
     
     context = {
-        'job_adverts': paginated_adverts
+        'job_adverts': paginated_adverts,
+        'facets': facet_groups(facet_counts, selected),
+        'filter_query': filter_query(request.GET),
+        'keyset_pages': keyset,
+        'skills': skills,
     }
     
-    return render(request, 'home.html', context)
\ No newline at end of file
+    return render(request, 'home.html', context)
+
+
+def autocomplete_query(params) -> tuple[str, list[str]]:
+    '''The typed prefix and the kinds of suggestion asked for, every kind when none is'''
+    kinds = [kind for kind in params.getlist('kind') if kind in KINDS]
+    return params.get('q', '')[:MAX_PREFIX_LENGTH], kinds or list(KINDS)
+
+
+def autocomplete(request: HttpRequest):
+    prefix, kinds = autocomplete_query(request.GET)
+    suggestions = get_autocomplete().suggest(prefix, kinds) if fold_term(prefix) else []
+    return JsonResponse({'suggestions': suggestions})
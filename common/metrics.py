@@ -0,0 +1,211 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates, Template
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun, task_retry, worker_ready
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+    start_http_server,
+)
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+VIEW_LATENCY = Histogram(
+    'django_view_latency_seconds', 'Time from the request entering the middleware to the response leaving it',
+    ['view', 'method'],
+)
+VIEW_DB_QUERIES = Histogram(
+    'django_view_db_queries', 'Database queries run while handling one request', ['view'], buckets=QUERY_BUCKETS,
+)
+VIEW_DB_TIME = Histogram(
+    'django_view_db_seconds', 'Time spent in database queries while handling one request', ['view'],
+)
+TEMPLATE_RENDER_TIME = Histogram(
+    'django_template_render_seconds', 'Time to render a top-level template', ['template'],
+)
+
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+TASK_QUEUE_WAIT = Histogram(
+    'celery_task_queue_wait_seconds', 'Time from a task being published to a worker starting it', ['task'],
+    buckets=TASK_BUCKETS,
+)
+TASK_RUNTIME = Histogram(
+    'celery_task_runtime_seconds', 'Time a worker spent executing a task', ['task', 'state'], buckets=TASK_BUCKETS,
+)
+TASK_RETRIES = Counter('celery_task_retries', 'Task retries scheduled', ['task'])
+TASK_FAILURES = Counter('celery_task_failures', 'Tasks that raised without being retried', ['task'])
+
+ENQUEUED_AT_HEADER = 'enqueued_at'
+
+
+class QueryTimer:
+    '''connection.execute_wrapper hook counting the queries of one request and the time they take'''
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started_at
+            self.count += 1
+
+
+# the QueryTimer of the request being handled; asgiref copies it into sync_to_async threads
+current_queries: ContextVar[QueryTimer | None] = ContextVar('current_queries', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    queries = current_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    '''Connections are per thread, so every one gets the hook instead of only those of the request's thread'''
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def view_label(request: HttpRequest) -> str:
+    '''URL name of the matched view (namespaced, e.g. admin:index), so ids in paths never become labels'''
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else 'unresolved'
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count and query time per view. Streaming responses are timed
+    until the response object is returned, not until the last chunk is sent.
+    Runs sync or async like the rest of the stack, so ASGI requests never hop to a thread here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self.__acall__(request)
+        with self.measure(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        with self.measure(request):
+            return await self.get_response(request)
+
+    @contextmanager
+    def measure(self, request: HttpRequest):
+        queries = QueryTimer()
+        token = current_queries.set(queries)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            current_queries.reset(token)
+        elapsed = time.perf_counter() - started_at
+
+        view = view_label(request)
+        VIEW_LATENCY.labels(view=view, method=request.method).observe(elapsed)
+        VIEW_DB_QUERIES.labels(view=view).observe(queries.count)
+        VIEW_DB_TIME.labels(view=view).observe(queries.duration)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started_at = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            name = self.origin.template_name or 'string'
+            TEMPLATE_RENDER_TIME.labels(template=name).observe(time.perf_counter() - started_at)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    '''DjangoTemplates whose templates report their render time'''
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def metrics_registry() -> CollectorRegistry:
+    '''Under gunicorn with PROMETHEUS_MULTIPROC_DIR set, merge the samples every worker wrote to disk'''
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics(request: HttpRequest):
+    '''Prometheus text for the addresses in settings.METRICS_ALLOWED_IPS, nobody when it is empty'''
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', None)
+    if not allowed_ips or request.META.get('REMOTE_ADDR') not in allowed_ips:
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def child_exit(server, worker):
+    '''gunicorn hook: drop the per-process files of a worker that exited'''
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def start_task_timer(task_id, task, **kwargs):
+    # workers expose custom message headers on the request itself, eager apply() nests them under headers
+    enqueued_at = task.request.get(ENQUEUED_AT_HEADER) or (task.request.headers or {}).get(ENQUEUED_AT_HEADER)
+    if enqueued_at is not None:
+        TASK_QUEUE_WAIT.labels(task=task.name).observe(max(time.time() - float(enqueued_at), 0))
+    task.request.started_at = time.perf_counter()
+
+
+@task_postrun.connect
+def stop_task_timer(task_id, task, state=None, **kwargs):
+    started_at = getattr(task.request, 'started_at', None)
+    if started_at is not None:
+        TASK_RUNTIME.labels(task=task.name, state=state or 'UNKNOWN').observe(time.perf_counter() - started_at)
+
+
+@task_retry.connect
+def count_task_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(task=sender.name if sender else 'unknown').inc()
+
+
+@task_failure.connect
+def count_task_failure(sender=None, **kwargs):
+    TASK_FAILURES.labels(task=sender.name if sender else 'unknown').inc()
+
+
+@worker_ready.connect
+def serve_worker_metrics(**kwargs):
+    '''Expose the worker's metrics itself when CELERY_METRICS_PORT is set, e.g. when it runs on another host'''
+    port = os.environ.get('CELERY_METRICS_PORT')
+    if port:
+        start_http_server(int(port), registry=metrics_registry())
@@ -0,0 +1,25 @@
+import re
+from django.db import connection
+from django.db.models import QuerySet
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?!CONSTANT ROW)(\w+)\b(?! USING (?:COVERING )?INDEX)')
+POSTGRES_SCAN = re.compile(r'\bSeq Scan on (\w+)')
+
+
+def full_table_scans(queryset: QuerySet) -> list[str]:
+    """
+    Run EXPLAIN for the queryset and return the tables it reads without an index.
+    An ordered walk over an index (SQLite's "SCAN t USING INDEX") is not reported.
+    Only SQLite and PostgreSQL plans are understood; other databases return an empty list.
+    """
+    plan = queryset.explain()
+    if connection.vendor == 'sqlite':
+        return SQLITE_SCAN.findall(plan)
+    if connection.vendor == 'postgresql':
+        return POSTGRES_SCAN.findall(plan)
+    return []
+
+
+def assert_uses_indexes(queryset: QuerySet) -> None:
+    scans = full_table_scans(queryset)
+    assert not scans, f'Full table scan on {", ".join(scans)}:\n{queryset.explain()}'
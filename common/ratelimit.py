@@ -0,0 +1,225 @@
+import hashlib
+import ipaddress
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from redis.exceptions import RedisError
+
+RATE_PATTERN = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCAL_BUCKET_LIMIT = 10_000
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] bucket, ARGV capacity, refill per second, now, cost -> {allowed, seconds until a token is free}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return {allowed, tostring((cost - tokens) / refill_rate)}
+"""
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    '''"5/m" -> (5, 60), "1/5m" -> (1, 300): bucket capacity and the seconds it takes to refill'''
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f'Invalid rate {rate!r}, expected e.g. "10/m" or "1/5m"')
+    capacity, multiplier, unit = match.groups()
+    return int(capacity), int(multiplier or 1) * PERIODS[unit]
+
+
+class LocalTokenBucket:
+    """
+    In-process token buckets, used when the cache is not Redis or Redis is unreachable.
+    Limits are per worker process, and only the most recently used buckets are kept.
+    """
+
+    def __init__(self, max_buckets: int = LOCAL_BUCKET_LIMIT):
+        self.buckets = OrderedDict()
+        self.max_buckets = max_buckets
+        self.lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float, cost: int = 1) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / refill_rate
+
+    def clear(self) -> None:
+        with self.lock:
+            self.buckets.clear()
+
+
+class RedisTokenBucket:
+    '''Token buckets shared by every worker, refilled and spent atomically by a Lua script'''
+
+    def __init__(self, client):
+        self.script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key: str, capacity: int, refill_rate: float, cost: int = 1) -> tuple[bool, float]:
+        allowed, retry_after = self.script(keys=[key], args=[capacity, refill_rate, time.time(), cost])
+        return bool(allowed), max(float(retry_after), 0.0)
+
+
+local_buckets = LocalTokenBucket()
+
+
+def get_token_bucket() -> RedisTokenBucket | LocalTokenBucket:
+    '''Share buckets through Redis when the default cache is django-redis, otherwise count in-process'''
+    if not hasattr(cache, 'client') or not hasattr(cache.client, 'get_client'):
+        return local_buckets
+    return RedisTokenBucket(cache.client.get_client(write=True))
+
+
+def consume(key: str, rate: str) -> tuple[bool, float]:
+    '''Take one token from the bucket named key, returning whether that was allowed and when to retry'''
+    capacity, period = parse_rate(rate)
+    refill_rate = capacity / period
+    bucket_key = f'ratelimit:{hashlib.md5(key.encode()).hexdigest()}'
+    bucket = get_token_bucket()
+    try:
+        return bucket.consume(bucket_key, capacity, refill_rate)
+    except RedisError:
+        logger.warning('Rate limit store unavailable, falling back to in-process buckets', exc_info=True)
+        return local_buckets.consume(bucket_key, capacity, refill_rate)
+
+
+@lru_cache(maxsize=8)
+def parse_networks(addresses: tuple[str, ...]) -> tuple:
+    '''"10.0.0.5" and "10.0.0.0/8" alike as networks'''
+    return tuple(ipaddress.ip_network(address.strip(), strict=False) for address in addresses if address.strip())
+
+
+def is_trusted_proxy(address: str, proxies: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in proxies)
+
+
+def client_ip(request: HttpRequest) -> str:
+    """
+    The address of the client. Behind the proxies in settings.RATE_LIMIT_TRUSTED_PROXIES it is
+    the right-most X-Forwarded-For hop that is not one of them: the hops left of it are written
+    by the client and cannot be trusted.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    proxies = parse_networks(tuple(getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', ())))
+    if not is_trusted_proxy(remote_addr, proxies):
+        return remote_addr
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop, proxies):
+            return hop
+    return hops[0] if hops else remote_addr
+
+
+def rate_limit_key(request: HttpRequest, key: str) -> str | None:
+    '''"ip" limits by client address, "post:<field>" by a submitted value such as the email'''
+    if key == 'ip':
+        return client_ip(request)
+    if key.startswith('post:'):
+        value = request.POST.get(key[len('post:'):], '').strip().lower()
+        return value or None
+    raise ValueError(f'Unknown rate limit key {key!r}')
+
+
+def too_many_requests(request: HttpRequest, retry_after: float) -> HttpResponse:
+    response = HttpResponse('Too many requests. Please try again later.', status=429, content_type='text/plain')
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def rate_limit(rate: str, key: str = 'ip', methods: tuple[str, ...] = ('POST',), limited_response=too_many_requests):
+    """
+    Reject requests to the view beyond rate for each value of key with 429 before the view runs.
+    Stack the decorator to limit on several keys, e.g. per IP and per submitted email.
+    limited_response(request, retry_after) builds the rejection when the view needs its own page.
+    """
+    parse_rate(rate)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper_func(request: HttpRequest, *args, **kwargs):
+            if getattr(settings, 'RATE_LIMIT_ENABLED', True) and request.method in methods:
+                value = rate_limit_key(request, key)
+                if value is not None:
+                    allowed, retry_after = consume(f'{view_func.__module__}.{view_func.__name__}:{key}:{value}', rate)
+                    if not allowed:
+                        return limited_response(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper_func
+    return decorator
+
+
+class RateLimitMiddleware:
+    """
+    Site-wide per-IP budget for state-changing requests (settings.RATE_LIMIT_DEFAULT),
+    applied on top of any per-view rate_limit. Under ASGI only those requests leave the
+    event loop, to talk to Redis; reads pass straight through.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def limited_rate(self, request: HttpRequest) -> str | None:
+        '''The site-wide rate the request counts against, None when it is not limited'''
+        rate = getattr(settings, 'RATE_LIMIT_DEFAULT', None)
+        if rate and getattr(settings, 'RATE_LIMIT_ENABLED', True) and request.method not in self.SAFE_METHODS:
+            return rate
+        return None
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self.__acall__(request)
+        rate = self.limited_rate(request)
+        if rate:
+            allowed, retry_after = consume(f'site:ip:{client_ip(request)}', rate)
+            if not allowed:
+                return too_many_requests(request, retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        rate = self.limited_rate(request)
+        if rate:
+            allowed, retry_after = await sync_to_async(consume)(f'site:ip:{client_ip(request)}', rate)
+            if not allowed:
+                return too_many_requests(request, retry_after)
+        return await self.get_response(request)
@@ -0,0 +1,48 @@
+import zipfile
+from collections.abc import Iterable, Iterator
+from django.core.files import File
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class StreamBuffer:
+    """
+    Write-only sink for zipfile. It has no seek(), so zipfile falls back to streaming mode
+    (data descriptors after each member) and everything written can be drained as soon as it lands.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(entries: Iterable[tuple[str, File]], chunk_size: int = ZIP_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of (archive name, file) pairs piece by piece.
+    Files are copied chunk_size bytes at a time, so memory use does not depend on archive size.
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for arcname, source in entries:
+            with source.open('rb'), archive.open(arcname, mode='w', force_zip64=True) as target:
+                for chunk in source.chunks(chunk_size):
+                    target.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
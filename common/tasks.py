@@ -1,17 +1,67 @@
-from django.core.mail import EmailMultiAlternatives
+import logging
+import smtplib
+import time
+from functools import lru_cache
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import get_template
 from celery import shared_task
 
 EMAIL_FROM = 'noreply@jobportal.com'
+EMAIL_BATCH_SIZE = 100
+# SMTP hiccups and dropped connections, retried after ~1s, 2s, 4s ... capped at 10 minutes
+EMAIL_RETRY_EXCEPTIONS = (smtplib.SMTPException, ConnectionError, TimeoutError)
+EMAIL_MAX_RETRIES = 6
 
-@shared_task
-def send_email(subject:str, email_to: list[str], html_template, context):
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=64)
+def load_template(html_template: str):
+    '''Compiled templates are cached for the lifetime of the worker process'''
+    return get_template(html_template)
+
+
+def build_email(subject: str, email_to: list[str], html_template, context, connection=None) -> EmailMultiAlternatives:
     msg = EmailMultiAlternatives(
         subject=subject,
-        from_email='noreply@jobportal.com',
-        to=email_to
+        from_email=EMAIL_FROM,
+        to=email_to,
+        connection=connection,
     )
-    html_template = get_template(html_template)
-    html_alternative = html_template.render(context)
+    html_alternative = load_template(html_template).render(context)
     msg.attach_alternative(html_alternative, "text/html")
-    msg.send(fail_silently=False)
\ No newline at end of file
+    return msg
+
+
+@shared_task(
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=EMAIL_MAX_RETRIES,
+)
+def send_email(subject:str, email_to: list[str], html_template, context):
+    msg = build_email(subject, email_to, html_template, context)
+    msg.send(fail_silently=False)
+
+
+@shared_task
+def send_email_batch(emails: list[dict], batch_size: int = EMAIL_BATCH_SIZE) -> int:
+    """
+    Send many emails over a single SMTP connection, batch_size messages at a time.
+    Each item in emails holds the keyword arguments of send_email.
+    """
+    sent = 0
+    with get_connection(fail_silently=False) as connection:
+        for start in range(0, len(emails), batch_size):
+            chunk = emails[start:start + batch_size]
+            started_at = time.perf_counter()
+            messages = [build_email(connection=connection, **email) for email in chunk]
+            delivered = connection.send_messages(messages) or 0
+            elapsed = time.perf_counter() - started_at
+            sent += delivered
+            logger.info(
+                'Sent email batch of %d in %.3fs (%.1f emails/s)',
+                delivered, elapsed, delivered / elapsed if elapsed else float(delivered)
+            )
+    return sent
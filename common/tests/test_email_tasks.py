@@ -0,0 +1,45 @@
+from unittest.mock import patch
+from django.core import mail
+import pytest
+
+from common import tasks
+
+
+def make_emails(count: int) -> list[dict]:
+    return [
+        {
+            'subject': 'Application Outcome',
+            'email_to': [f'applicant{n}@example.com'],
+            'html_template': 'emails/job_application_update.html',
+            'context': {'applicant_name': f'Applicant {n}', 'job_title': 'Engineer', 'company_name': 'Acme'},
+        }
+        for n in range(count)
+    ]
+
+
+def test_send_email_batch_reuses_one_connection():
+    with patch.object(tasks, 'get_connection', wraps=tasks.get_connection) as get_connection:
+        sent = tasks.send_email_batch(make_emails(7), batch_size=3)
+
+    assert sent == 7
+    get_connection.assert_called_once()
+    assert len(mail.outbox) == 7
+    assert mail.outbox[0].to == ['applicant0@example.com']
+    assert 'Applicant 0' in mail.outbox[0].alternatives[0][0]
+
+
+def test_templates_are_compiled_once_per_worker():
+    tasks.load_template.cache_clear()
+    tasks.send_email_batch(make_emails(5))
+
+    assert tasks.load_template.cache_info().misses == 1
+    assert tasks.load_template.cache_info().hits == 4
+
+
+def test_send_email_batch_surfaces_delivery_errors(settings):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = 'localhost'
+    settings.EMAIL_PORT = 1
+
+    with pytest.raises(OSError):
+        tasks.send_email_batch(make_emails(1))
@@ -0,0 +1,91 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+from prometheus_client import REGISTRY
+
+from application_tracking.models import JobAdvert
+from application_tracking.tests.factories import JobAdvertFactory
+from common.metrics import MetricsMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_measured_per_view(client, user_instance):
+    advert = JobAdvertFactory(created_by=user_instance)
+    before = {
+        "requests": sample("django_view_latency_seconds_count", view="job_advert", method="GET"),
+        "queries": sample("django_view_db_queries_sum", view="job_advert"),
+        "renders": sample("django_template_render_seconds_count", template="advert.html"),
+    }
+
+    response = client.get(reverse("job_advert", kwargs={"advert_id": advert.id}))
+
+    assert response.status_code == 200
+    assert sample("django_view_latency_seconds_count", view="job_advert", method="GET") == before["requests"] + 1
+    # the advert, its skills and its similar adverts
+    assert sample("django_view_db_queries_sum", view="job_advert") == before["queries"] + 3
+    assert sample("django_view_db_seconds_count", view="job_advert") > 0
+    assert sample("django_template_render_seconds_count", template="advert.html") == before["renders"] + 1
+
+
+def test_unmatched_paths_share_one_label(client):
+    before = sample("django_view_latency_seconds_count", view="unresolved", method="GET")
+
+    client.get("/no-such-page/")
+
+    assert sample("django_view_latency_seconds_count", view="unresolved", method="GET") == before + 1
+
+
+@override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    client.get(reverse("home"))
+
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert b'django_view_latency_seconds_bucket{le="0.005",method="GET",view="home"}' in response.content
+
+
+@override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+def test_metrics_endpoint_merges_worker_files(client, monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == 200
+
+
+@override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"])
+def test_metrics_endpoint_can_be_restricted(client):
+    assert client.get(reverse("metrics")).status_code == 403
+    assert client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.5").status_code == 200
+
+
+@override_settings(METRICS_ALLOWED_IPS=[])
+def test_metrics_endpoint_is_closed_by_default(client):
+    assert client.get(reverse("metrics")).status_code == 403
+
+
+def test_middleware_runs_async_under_asgi(user_instance):
+    advert = JobAdvertFactory(created_by=user_instance)
+    before = sample("django_view_db_queries_sum", view="job_advert")
+
+    async def view(request):
+        request.resolver_match = resolve(reverse("job_advert", kwargs={"advert_id": advert.id}))
+        await JobAdvert.objects.filter(pk=advert.pk).aexists()
+        return HttpResponse("ok")
+
+    middleware = MetricsMiddleware(view)
+    response = async_to_sync(middleware)(RequestFactory().get("/"))
+
+    assert iscoroutinefunction(middleware)
+    assert response.status_code == 200
+    # the query ran in a worker thread but was counted against the request
+    assert sample("django_view_db_queries_sum", view="job_advert") == before + 1
@@ -0,0 +1,128 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from common import ratelimit
+from common.ratelimit import LocalTokenBucket, RateLimitMiddleware, client_ip, parse_rate, rate_limit
+
+
+@rate_limit("3/m", key="ip")
+@rate_limit("1/m", key="post:email")
+def view(request):
+    return HttpResponse("ok")
+
+
+def post(email="someone@example.com", ip="10.0.0.1"):
+    return RequestFactory().post("/", {"email": email}, REMOTE_ADDR=ip)
+
+
+def test_parse_rate():
+    assert parse_rate("5/m") == (5, 60)
+    assert parse_rate("1/5m") == (1, 300)
+    with pytest.raises(ValueError):
+        parse_rate("5 per minute")
+
+
+def test_local_bucket_refills_over_time(monkeypatch):
+    clock = iter([0.0, 0.0, 0.0, 30.0])
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: next(clock))
+    bucket = LocalTokenBucket()
+
+    assert bucket.consume("key", capacity=2, refill_rate=2 / 60) == (True, 0.0)
+    assert bucket.consume("key", capacity=2, refill_rate=2 / 60) == (True, 0.0)
+    allowed, retry_after = bucket.consume("key", capacity=2, refill_rate=2 / 60)
+    assert not allowed and retry_after == pytest.approx(30)
+    assert bucket.consume("key", capacity=2, refill_rate=2 / 60)[0]
+
+
+def test_local_bucket_forgets_least_recently_used_keys():
+    bucket = LocalTokenBucket(max_buckets=2)
+    for key in ("a", "b", "c"):
+        bucket.consume(key, capacity=1, refill_rate=1)
+
+    assert list(bucket.buckets) == ["b", "c"]
+
+
+def test_decorator_limits_each_key_separately():
+    assert view(post()).status_code == 200
+
+    response = view(post())
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) == 60
+
+    assert view(post(email="other@example.com")).status_code == 200
+    assert view(post(email="third@example.com")).status_code == 429
+
+
+def test_decorator_ignores_safe_methods():
+    for _ in range(5):
+        assert view(RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")).status_code == 200
+
+
+def test_middleware_limits_state_changing_requests(settings):
+    settings.RATE_LIMIT_DEFAULT = "2/m"
+    middleware = RateLimitMiddleware(lambda request: HttpResponse("ok"))
+
+    assert [middleware(post()).status_code for _ in range(3)] == [200, 200, 429]
+    assert middleware(RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")).status_code == 200
+    assert middleware(post(ip="10.0.0.2")).status_code == 200
+
+
+def test_middleware_runs_async_under_asgi(settings):
+    settings.RATE_LIMIT_DEFAULT = "2/m"
+
+    async def view(request):
+        return HttpResponse("ok")
+
+    middleware = RateLimitMiddleware(view)
+
+    assert iscoroutinefunction(middleware)
+    assert [async_to_sync(middleware)(post()).status_code for _ in range(3)] == [200, 200, 429]
+    assert async_to_sync(middleware)(RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")).status_code == 200
+
+
+def test_client_ip_looks_past_trusted_proxies(settings):
+    settings.RATE_LIMIT_TRUSTED_PROXIES = ["127.0.0.1", "10.0.0.0/8"]
+
+    def forwarded(remote_addr, forwarded_for=None):
+        extra = {"HTTP_X_FORWARDED_FOR": forwarded_for} if forwarded_for is not None else {}
+        return client_ip(RequestFactory().post("/", REMOTE_ADDR=remote_addr, **extra))
+
+    assert forwarded("10.0.0.3", "203.0.113.9") == "203.0.113.9"
+    # the client wrote the left-most hop itself
+    assert forwarded("127.0.0.1", "1.2.3.4, 203.0.113.9, 10.0.0.3") == "203.0.113.9"
+    assert forwarded("10.0.0.3", "10.0.0.7, 10.0.0.8") == "10.0.0.7"
+    assert forwarded("10.0.0.3") == "10.0.0.3"
+    # only trusted proxies are believed
+    assert forwarded("198.51.100.4", "203.0.113.9") == "198.51.100.4"
+
+    settings.RATE_LIMIT_TRUSTED_PROXIES = []
+    assert forwarded("10.0.0.3", "203.0.113.9") == "10.0.0.3"
+
+
+def test_middleware_gives_each_client_behind_the_proxy_a_budget(settings):
+    settings.RATE_LIMIT_DEFAULT = "1/m"
+    settings.RATE_LIMIT_TRUSTED_PROXIES = ["10.0.0.1"]
+    middleware = RateLimitMiddleware(lambda request: HttpResponse("ok"))
+
+    def post_from(client):
+        return RequestFactory().post("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=client)
+
+    assert middleware(post_from("203.0.113.9")).status_code == 200
+    assert middleware(post_from("203.0.113.9")).status_code == 429
+    assert middleware(post_from("198.51.100.4")).status_code == 200
+
+
+def test_falls_back_to_local_buckets_when_redis_is_down():
+    unreachable_redis = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://127.0.0.1:1/0",
+            "OPTIONS": {"SOCKET_CONNECT_TIMEOUT": 0.1},
+        }
+    }
+
+    with override_settings(CACHES=unreachable_redis):
+        assert view(post()).status_code == 200
+        assert view(post()).status_code == 429
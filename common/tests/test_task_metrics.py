@@ -0,0 +1,81 @@
+import smtplib
+import time
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from prometheus_client import REGISTRY
+
+from common import metrics
+from common.tasks import send_email
+
+TASK = 'common.tasks.send_email'
+EMAIL = {
+    'subject': 'Verify your account',
+    'email_to': ['someone@example.com'],
+    'html_template': 'emails/email_verification_template.html',
+    'context': {'code': '123456'},
+}
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_publish_stamps_the_enqueue_time():
+    headers = {}
+    metrics.stamp_enqueue_time(headers=headers)
+
+    assert time.time() - headers[metrics.ENQUEUED_AT_HEADER] < 1
+
+
+def test_queue_wait_and_runtime_are_recorded():
+    waits = sample('celery_task_queue_wait_seconds_count', task=TASK)
+    runs = sample('celery_task_runtime_seconds_count', task=TASK, state='SUCCESS')
+
+    send_email.apply(kwargs=EMAIL, headers={metrics.ENQUEUED_AT_HEADER: time.time() - 3})
+
+    assert sample('celery_task_queue_wait_seconds_count', task=TASK) == waits + 1
+    assert sample('celery_task_queue_wait_seconds_sum', task=TASK) >= 3
+    assert sample('celery_task_runtime_seconds_count', task=TASK, state='SUCCESS') == runs + 1
+    assert len(mail.outbox) == 1
+
+
+def test_send_email_retries_transient_smtp_errors():
+    retries = sample('celery_task_retries_total', task=TASK)
+    send = EmailMultiAlternatives.send
+    outcomes = iter([smtplib.SMTPServerDisconnected('gone'), ConnectionResetError('reset')])
+
+    def flaky_send(message, *args, **kwargs):
+        error = next(outcomes, None)
+        if error:
+            raise error
+        return send(message, *args, **kwargs)
+
+    with patch.object(EmailMultiAlternatives, 'send', flaky_send):
+        result = send_email.apply(kwargs=EMAIL)
+
+    assert result.successful()
+    assert len(mail.outbox) == 1
+    assert sample('celery_task_retries_total', task=TASK) == retries + 2
+
+
+def test_send_email_gives_up_after_max_retries():
+    failures = sample('celery_task_failures_total', task=TASK)
+
+    with patch.object(EmailMultiAlternatives, 'send', side_effect=smtplib.SMTPServerDisconnected('gone')):
+        result = send_email.apply(kwargs=EMAIL)
+
+    assert result.failed()
+    assert sample('celery_task_failures_total', task=TASK) == failures + 1
+
+
+def test_send_email_does_not_retry_programming_errors():
+    retries = sample('celery_task_retries_total', task=TASK)
+
+    with patch.object(EmailMultiAlternatives, 'send', side_effect=TypeError('bug')):
+        result = send_email.apply(kwargs=EMAIL)
+
+    assert result.failed()
+    assert sample('celery_task_retries_total', task=TASK) == retries
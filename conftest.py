@@ -2,6 +2,28 @@ from django.test.client import Client
 import pytest
 from accounts.models import User
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from common.ratelimit import local_buckets
+from application_tracking.autocomplete import reset_autocomplete
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    '''Run every test against an empty in-process cache instead of Redis'''
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+    local_buckets.clear()
+    reset_autocomplete()
+    yield
+    cache.clear()
+    local_buckets.clear()
+    reset_autocomplete()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    '''Keep files uploaded by tests out of the working tree'''
+    settings.MEDIA_ROOT = tmp_path / 'media'
+
 
 @pytest.fixture
 def client():
@@ -2,6 +2,8 @@ import os
 
 from celery import Celery
 
+import common.metrics  # noqa: F401 connects the Celery task metrics signals
+
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
 
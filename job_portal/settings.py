@@ -12,7 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,7 +50,9 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    'common.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'common.ratelimit.RateLimitMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -62,7 +65,7 @@ ROOT_URLCONF = 'job_portal.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'common.metrics.InstrumentedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,6 +80,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'job_portal.wsgi.application'
 
+# Route the read-heavy job views to their async implementations (for ASGI deployments)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -89,6 +95,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config('REDIS_CACHE_URL', default='redis://localhost:6379/1'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    }
+}
+
+# Seconds a rendered public listing or search page stays cached
+LISTING_CACHE_TIMEOUT = 60 * 15
+
+# Seconds between a process's checks for adverts saved by other processes, which rebuild its autocomplete index
+AUTOCOMPLETE_MAX_AGE = 60 * 5
+
+# Per-IP budget for POST/PUT/DELETE requests across the whole site, on top of per-view limits
+RATE_LIMIT_DEFAULT = config('RATE_LIMIT_DEFAULT', default='120/m')
+
+# Reverse proxies (addresses or networks) whose X-Forwarded-For is believed when rate limiting by IP
+RATE_LIMIT_TRUSTED_PROXIES = config('RATE_LIMIT_TRUSTED_PROXIES', default='', cast=Csv())
+
+# Addresses allowed to scrape /metrics, nobody when empty
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -153,4 +188,15 @@ CELERY_RESULT_BACKEND = 'redis://localhost:6379'
 
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
\ No newline at end of file
+CELERY_RESULT_SERIALIZER = 'json'
+
+CELERY_BEAT_SCHEDULE = {
+    'purge-expired-verifications': {
+        'task': 'accounts.tasks.purge_expired_rows',
+        'schedule': 15 * 60,
+    },
+    'rebuild-similar-adverts': {
+        'task': 'application_tracking.tasks.rebuild_similar_adverts',
+        'schedule': crontab(hour=3, minute=0),
+    },
+}
\ No newline at end of file
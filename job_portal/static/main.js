@@ -9,3 +9,81 @@ window.onload = function() {
     }, 5000);
   });
 };
+
+
+// Keyset-paginated listings: fetch the next page when its link scrolls into view
+// and append its adverts to the current list instead of navigating away.
+document.addEventListener('DOMContentLoaded', function() {
+  if (!('IntersectionObserver' in window)) {
+    return;
+  }
+
+  const observer = new IntersectionObserver(function(entries) {
+    entries.forEach(function(entry) {
+      if (!entry.isIntersecting) {
+        return;
+      }
+      const link = entry.target;
+      observer.unobserve(link);
+
+      fetch(link.href, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+        .then(function(response) { return response.text(); })
+        .then(function(html) {
+          const page = new DOMParser().parseFromString(html, 'text/html');
+          const target = document.querySelector(link.dataset.target);
+          const incoming = page.querySelector(link.dataset.target);
+          if (target && incoming) {
+            target.append(...incoming.children);
+          }
+
+          const nextLink = page.querySelector('[data-infinite-scroll]');
+          if (nextLink) {
+            link.href = new URL(nextLink.getAttribute('href'), link.href).href;
+            observer.observe(link);
+          } else {
+            link.replaceWith(document.createTextNode('No more jobs'));
+          }
+        });
+    });
+  });
+
+  document.querySelectorAll('[data-infinite-scroll]').forEach(function(link) {
+    observer.observe(link);
+  });
+});
+
+
+// Typeahead: fill the datalist of a search input with suggestions for what has been typed so far.
+document.addEventListener('DOMContentLoaded', function() {
+  document.querySelectorAll('[data-autocomplete]').forEach(function(input) {
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener('input', function() {
+      clearTimeout(timer);
+      timer = setTimeout(function() {
+        if (controller) {
+          controller.abort();
+        }
+        const list = input.list;
+        const prefix = input.value.trim();
+        if (!list || !prefix) {
+          return;
+        }
+        controller = new AbortController();
+        const url = input.dataset.autocomplete + '&q=' + encodeURIComponent(prefix);
+
+        fetch(url, { signal: controller.signal })
+          .then(function(response) { return response.json(); })
+          .then(function(data) {
+            list.replaceChildren(...data.suggestions.map(function(suggestion) {
+              const option = document.createElement('option');
+              option.value = suggestion.label;
+              return option;
+            }));
+          })
+          .catch(function() {});
+      }, 150);
+    });
+  });
+});
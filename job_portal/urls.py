@@ -16,13 +16,15 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from application_tracking.views import list_adverts
+from application_tracking.urls import read_views
 from django.conf import settings
 from django.conf.urls.static import static
+from common.metrics import metrics
 
 urlpatterns = [
-    path('', list_adverts, name='home'),
+    path('', read_views.list_adverts, name='home'),
     path('admin/', admin.site.urls),
     path("auth/", include("accounts.urls")),
     path('adverts/', include('application_tracking.urls')),
+    path('metrics', metrics, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)